@@ -13,4 +13,4 @@ default_task = "publish"
 
 @init
 def set_properties(project):
-    pass
+    project.set_property("distutils_console_scripts", ["uc3m_care_import = uc3m_care.bulk_import:main"])
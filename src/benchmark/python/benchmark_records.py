@@ -0,0 +1,95 @@
+"""Benchmark of the record classes VaccinePatientRegister and VaccinationAppoinment
+
+Measures the memory taken by every object and the cost of reading
+vaccination_signature. The objects use __slots__, so the memory of each one
+is compared with the one of the same attributes kept in a per-instance
+__dict__, as the classes did before. The signature is computed the first
+time it is read and cached, so the first read is compared with the next ones.
+
+Usage (from the root of the project):
+    PYTHONPATH=src/main/python python src/benchmark/python/benchmark_records.py [--objects 100000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+from uc3m_care.vaccine_patient_register import VaccinePatientRegister
+from uc3m_care.vaccination_appoinment import VaccinationAppoinment
+
+
+class DictRecord:
+    """Object that keeps its attributes in a per-instance __dict__"""
+
+
+def create_registers(objects):
+    """Returns objects VaccinePatientRegister of the same patient"""
+    return [VaccinePatientRegister("43831e01-cd0f-4b97-aa6d-c071b42129f0", "Fernando Alonso",
+                                   "Regular", "123456789", 20) for _ in range(objects)]
+
+
+def create_appointments(objects):
+    """Returns objects VaccinationAppoinment of the same patient"""
+    return [VaccinationAppoinment("43831e01-cd0f-4b97-aa6d-c071b42129f0", "72b72255619afeed8bd26861a2bc2caf",
+                                  "123456789", 10) for _ in range(objects)]
+
+
+def slot_names(cls):
+    """Returns the mangled names of the slots of cls"""
+    names = []
+    for klass in cls.__mro__:
+        names.extend(sys.intern("_" + klass.__name__.lstrip("_") + name) if name.startswith("__") else name
+                     for name in getattr(klass, "__slots__", ()))
+    return names
+
+
+def object_bytes(create, objects):
+    """Returns the bytes allocated per object by create (with the values of its
+    attributes), the size of one object and the size of one object with the
+    same attributes in a per-instance __dict__"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    records = create(objects)
+    allocated = (tracemalloc.get_traced_memory()[0] - before) / objects
+    tracemalloc.stop()
+    copy = DictRecord()
+    for name in slot_names(type(records[0])):
+        if hasattr(records[0], name):
+            setattr(copy, name, getattr(records[0], name))
+    return allocated, sys.getsizeof(records[0]), sys.getsizeof(copy) + sys.getsizeof(copy.__dict__)
+
+
+def signature_reads(objects):
+    """Returns the microseconds of the first and of the next reads of vaccination_signature"""
+    appointments = create_appointments(objects)
+    start = time.perf_counter()
+    for appointment in appointments:
+        _ = appointment.vaccination_signature
+    first = time.perf_counter() - start
+    start = time.perf_counter()
+    for appointment in appointments:
+        _ = appointment.vaccination_signature
+    cached = time.perf_counter() - start
+    return first / objects * 10 ** 6, cached / objects * 10 ** 6
+
+
+def main():
+    """Runs the benchmark and prints the results"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=100000, help="number of objects created")
+    arguments = parser.parse_args()
+
+    print("%-24s %16s %14s %16s" % ("class", "allocated/object", "slotted size", "with __dict__"))
+    for name, create in [("VaccinePatientRegister", create_registers),
+                         ("VaccinationAppoinment", create_appointments)]:
+        allocated, slotted, with_dict = object_bytes(create, arguments.objects)
+        print("%-24s %16.1f %14d %16d" % (name, allocated, slotted, with_dict))
+
+    first, cached = signature_reads(arguments.objects)
+    print()
+    print("vaccination_signature: first read %.2f us, next reads %.2f us" % (first, cached))
+    print("get_vaccine_date reads it twice: %.2f us instead of %.2f us" % (first + cached, 2 * first))
+
+
+if __name__ == "__main__":
+    main()
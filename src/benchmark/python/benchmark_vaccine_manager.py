@@ -0,0 +1,208 @@
+"""Benchmark of the three operations of VaccineManager (RF1, RF2 and RF3)
+
+For every backend and store size the stores are filled with synthetic
+patients and appointments, and then each operation is run a number of
+times, measuring throughput (ops/sec), latency (p50/p99) and peak memory.
+
+Usage (from the root of the project):
+    PYTHONPATH=src/main/python python src/benchmark/python/benchmark_vaccine_manager.py
+        [--sizes 1000 100000 1000000] [--backends memory json sqlite] [--operations 1000]
+        [--save-baseline] [--tolerance 0.5]
+
+The results are compared with src/benchmark/baselines.json and the script
+ends with exit code 1 if any throughput is below baseline * (1 - tolerance).
+The stored baselines were recorded with --sizes 1000 100000 --operations 100;
+with the json backend every write rewrites the whole file, so the 1000000
+case takes a long time.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_patient_register import VaccinePatientRegister
+from uc3m_care.vaccination_appoinment import VaccinationAppoinment
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.sqlite_storage import SqliteStorage
+
+BASELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "baselines.json")
+OPERATIONS = ["request_vaccination_id", "get_vaccine_date", "vaccine_patient"]
+
+
+def synthetic_patient(generator):
+    """Returns the arguments of request_vaccination_id of a valid random patient"""
+    return {"patient_id": str(uuid.UUID(int=generator.getrandbits(128), version=4)),
+            "registration_type": generator.choice(["Regular", "Family"]),
+            "name_surname": "Nombre" + str(generator.randrange(10000)) + " Apellido",
+            "phone_number": str(generator.randrange(10 ** 8, 10 ** 9)),
+            "age": generator.randrange(6, 126)}
+
+
+def synthetic_records(size, generator):
+    """Returns size patient registry records and their appointments"""
+    patients = []
+    appointments = []
+    for _ in range(size):
+        patient = synthetic_patient(generator)
+        register = VaccinePatientRegister(patient["patient_id"], patient["name_surname"],
+                                          patient["registration_type"], patient["phone_number"], patient["age"])
+        record = register.__dict__()
+        date = VaccinationAppoinment(record["patient_id"], record["patient_system_id"], record["phone_number"], 10)
+        patients.append(record)
+        appointments.append({"patient_id": date.patient_id, "phone_number": date.phone_number,
+                             "vaccine_date": "2099-01-01", "patient_system_id": date.patient_sys_id,
+                             "date_signature": date.vaccination_signature})
+    return patients, appointments
+
+
+def create_storage(backend, folder, patients, appointments):
+    """Creates a storage of the given backend filled with the records"""
+    if backend == "memory":
+        storage = MemoryStorage()
+    elif backend == "sqlite":
+        storage = SqliteStorage(os.path.join(folder, "vaccines.db"))
+    else:
+        for name in ["patient_registry.json", "vaccination_appointments.json", "registered_vaccinations.json"]:
+            with open(os.path.join(folder, name), "w", encoding="utf-8") as file:
+                json.dump([], file)
+        storage = JsonStorage(os.path.join(folder, "patient_registry.json"),
+                              os.path.join(folder, "vaccination_appointments.json"),
+                              os.path.join(folder, "registered_vaccinations.json"))
+    storage.add_patients(patients)
+    storage.add_appointments(appointments)
+    return storage
+
+
+def percentile(values, fraction):
+    """Returns the value at the given fraction of the sorted values"""
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def measure(operation, arguments):
+    """Runs operation once per argument and returns the statistics of the run"""
+    latencies = []
+    start = time.perf_counter()
+    for argument in arguments:
+        begin = time.perf_counter()
+        operation(argument)
+        latencies.append(time.perf_counter() - begin)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {"ops_per_sec": len(arguments) / elapsed,
+            "p50_ms": percentile(latencies, 0.50) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000}
+
+
+def peak_memory(operation, arguments):
+    """Returns the peak of memory allocated (in KiB) while running operation"""
+    tracemalloc.start()
+    for argument in arguments:
+        operation(argument)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def collection_files(folder, records):
+    """Writes the files read by get_vaccine_date for the records, returns their paths"""
+    paths = []
+    for record in records:
+        path = os.path.join(folder, record["patient_system_id"] + ".json")
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({"PatientSystemID": record["patient_system_id"],
+                       "ContactPhoneNumber": record["phone_number"]}, file)
+        paths.append(path)
+    return paths
+
+
+def run_case(backend, size, operations, generator):
+    """Benchmarks the three operations for a backend and a store size"""
+    results = {}
+    patients, appointments = synthetic_records(size, generator)
+    new_patients = [synthetic_patient(generator) for _ in range(operations)]
+    with tempfile.TemporaryDirectory() as folder:
+        files = collection_files(folder, generator.sample(patients, min(operations, size)))
+        signatures = [appointment["date_signature"] for appointment in generator.sample(appointments, min(operations, size))]
+        memory_sample = max(1, operations // 10)
+        cases = [("request_vaccination_id", lambda manager, patient: manager.request_vaccination_id(**patient), new_patients),
+                 ("get_vaccine_date", lambda manager, path: manager.get_vaccine_date(path), files),
+                 ("vaccine_patient", lambda manager, signature: manager.vaccine_patient(signature), signatures)]
+        for name, operation, arguments in cases:
+            for phase in ["time", "memory"]:
+                # Cada medida empieza con un almacen nuevo, asi se incluye la carga de los indices
+                store_folder = tempfile.mkdtemp(dir=folder)
+                storage = create_storage(backend, store_folder, patients, appointments)
+                manager = VaccineManager(storage=storage)
+                if phase == "time":
+                    results[name] = measure(lambda argument, op=operation, m=manager: op(m, argument), arguments)
+                else:
+                    results[name]["peak_kib"] = peak_memory(lambda argument, op=operation, m=manager: op(m, argument),
+                                                            arguments[:memory_sample])
+                if backend == "sqlite":
+                    storage.close()
+    return results
+
+
+def compare(results, baselines, tolerance):
+    """Prints the results and returns the list of regressions against the baselines"""
+    regressions = []
+    print("%-8s %9s %-24s %12s %10s %10s %12s %12s" %
+          ("backend", "size", "operation", "ops/sec", "p50 ms", "p99 ms", "peak KiB", "baseline"))
+    for key, result in sorted(results.items()):
+        backend, size, operation = key.split("/")
+        baseline = baselines.get(key, {}).get("ops_per_sec")
+        print("%-8s %9s %-24s %12.1f %10.3f %10.3f %12.1f %12s" %
+              (backend, size, operation, result["ops_per_sec"], result["p50_ms"], result["p99_ms"],
+               result["peak_kib"], "-" if baseline is None else "%.1f" % baseline))
+        if baseline is not None and result["ops_per_sec"] < baseline * (1 - tolerance):
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    """Runs the benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark of the operations of VaccineManager")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="number of records in the stores before measuring")
+    parser.add_argument("--backends", nargs="+", default=["memory", "json", "sqlite"],
+                        choices=["memory", "json", "sqlite"])
+    parser.add_argument("--operations", type=int, default=1000, help="calls measured per operation")
+    parser.add_argument("--seed", type=int, default=2022)
+    parser.add_argument("--baselines", default=BASELINES)
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baselines")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="fraction of the baseline throughput that can be lost before failing")
+    args = parser.parse_args(argv)
+
+    generator = random.Random(args.seed)
+    results = {}
+    for size in args.sizes:
+        for backend in args.backends:
+            for operation, result in run_case(backend, size, args.operations, generator).items():
+                results[backend + "/" + str(size) + "/" + operation] = result
+
+    baselines = {}
+    if os.path.isfile(args.baselines):
+        with open(args.baselines, "r", encoding="utf-8") as file:
+            baselines = json.load(file)
+    regressions = compare(results, baselines, args.tolerance)
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(args.baselines, "w", encoding="utf-8") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+        return 0
+    for key in regressions:
+        print("REGRESSION: " + key)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,5 +2,26 @@
 
 from .vaccine_patient_register import VaccinePatientRegister
 from .vaccine_manager import VaccineManager
+from .async_vaccine_manager import AsyncVaccineManager
 from .vaccine_management_exception import VaccineManagementException
 from .vaccination_appoinment import VaccinationAppoinment
+from .storage_backend import StorageBackend
+from .json_storage import JsonStorage, StreamingJsonStorage
+from .sqlite_storage import SqliteStorage
+from .memory_storage import MemoryStorage
+from .sharded_storage import ShardedStorage
+from .patient_table import PatientTable
+from .instrumentation import Instrumentation, MetricsCollector, PhaseMetrics
+from .profiling import OperationProfiler
+from .slot_allocator import SlotAllocator
+from .read_cache import ReadCache
+
+
+def __getattr__(name):
+    """Imports PatientColumnValidator the first time it is used, so importing
+    uc3m_care does not load numpy"""
+    if name == "PatientColumnValidator":
+        # pylint: disable=import-outside-toplevel
+        from .patient_column_validator import PatientColumnValidator
+        return PatientColumnValidator
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
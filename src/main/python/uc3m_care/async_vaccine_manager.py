@@ -0,0 +1,99 @@
+"""Contains the class AsyncVaccineManager"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from uc3m_care.vaccine_manager import VaccineManager
+
+
+class AsyncVaccineManager:
+    """Class for providing the methods of VaccineManager to asyncio code
+
+    Every operation runs in an executor, so the file I/O and the JSON parsing
+    do not block the event loop. The operations write to the stores, so they
+    go through an internal asyncio.Lock one at a time, in the order they were
+    called; the stores and their indexes are never used by two threads at once.
+    """
+
+    def __init__(self, vaccine_manager: VaccineManager = None, executor=None) -> None:
+        """
+        :param vaccine_manager: VaccineManager that does the work, by default a new one
+        :param executor: concurrent.futures executor where the operations run, by
+        default a ThreadPoolExecutor with one thread owned by this object
+        """
+        self.__vaccine_manager = vaccine_manager if vaccine_manager is not None else VaccineManager()
+        self.__own_executor = executor is None
+        self.__executor = executor if executor is not None else ThreadPoolExecutor(max_workers=1)
+        self.__lock = asyncio.Lock()
+
+    @property
+    def vaccine_manager(self):
+        """Property that represents the VaccineManager used by the operations"""
+        return self.__vaccine_manager
+
+    async def __run(self, function, *args, **kwargs):
+        """Runs function in the executor holding the lock and returns its result"""
+        loop = asyncio.get_running_loop()
+        async with self.__lock:
+            return await loop.run_in_executor(self.__executor, functools.partial(function, *args, **kwargs))
+
+    #RF1
+
+    async def request_vaccination_id(self, patient_id: str, registration_type: str,
+                                     name_surname: str, phone_number: str,
+                                     age: int) -> str:
+        """
+        Requests the vaccination ID without blocking the event loop
+        :return MD5 hash of the patient ID (str)
+        :raises: VaccineManagementException: If any of the fields is not valid
+        """
+        return await self.__run(self.__vaccine_manager.request_vaccination_id, patient_id,
+                                registration_type, name_surname, phone_number, age)
+
+    async def request_vaccination_ids(self, patients) -> list:
+        """
+        Requests the vaccination ID of several patients without blocking the event loop
+        :return: list with one dict per patient, as VaccineManager.request_vaccination_ids
+        """
+        return await self.__run(self.__vaccine_manager.request_vaccination_ids, list(patients))
+
+    #RF2
+
+    async def get_vaccine_date(self, input_file, center=None):
+        """
+        Generates the appointment of a patient file without blocking the event loop
+        :return: signature of the appointment (str)
+        :raises: VaccineManagementException: If the file or the patient are not valid
+        """
+        return await self.__run(self.__vaccine_manager.get_vaccine_date, input_file, center)
+
+    async def get_vaccine_dates(self, input_files, center=None):
+        """
+        Generates the appointments of several patient files without blocking the event loop
+        :return: list with one dict per file, as VaccineManager.get_vaccine_dates
+        """
+        if not isinstance(input_files, str):
+            input_files = list(input_files)
+        return await self.__run(self.__vaccine_manager.get_vaccine_dates, input_files, center)
+
+    #RF3
+
+    async def vaccine_patient(self, date_signature):
+        """
+        Registers the vaccination of an appointment without blocking the event loop
+        :return: True if the vaccination is registered
+        :raises: VaccineManagementException: If the signature is not valid
+        """
+        return await self.__run(self.__vaccine_manager.vaccine_patient, date_signature)
+
+    async def vaccine_patients(self, date_signatures) -> list:
+        """
+        Registers the vaccination of several appointments without blocking the event loop
+        :return: list with one dict per signature, as VaccineManager.vaccine_patients
+        """
+        return await self.__run(self.__vaccine_manager.vaccine_patients, list(date_signatures))
+
+    def close(self):
+        """Shuts down the executor if it was created by this object"""
+        if self.__own_executor:
+            self.__executor.shutdown(wait=True)
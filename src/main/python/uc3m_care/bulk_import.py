@@ -0,0 +1,186 @@
+"""Command line tool that imports a CSV of patients into the patient registry
+
+The rows are validated with the rules of request_vaccination_id and their
+patient_system_id (the MD5 of VaccinePatientRegister) is computed in a pool of
+processes. All the patients are then written to the registry in a single
+write, and the time of every step is printed.
+
+Usage:
+    uc3m_care_import patients.csv [--db FOLDER] [--processes N] [--chunk-size N]
+
+The CSV needs a header with the columns patient_id, registration_type,
+name_surname, phone_number and age; other columns are ignored. The exit code
+is 0 if every row was imported, 1 if some rows were rejected (the valid ones
+are imported) and 2 if the CSV could not be imported.
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.vaccine_patient_register import VaccinePatientRegister
+from uc3m_care.json_store import JSON_FORMAT, STORE_FORMATS
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.memory_storage import MemoryStorage
+
+CSV_FIELDS = ["patient_id", "registration_type", "name_surname", "phone_number", "age"]
+
+@lru_cache(maxsize=None)
+def patient_validator():
+    """Returns the VaccineManager of this process that validates the rows, without touching any file"""
+    # Cada proceso del pool crea el suyo la primera vez y lo reutiliza en los demas trozos
+    return VaccineManager(storage=MemoryStorage())
+
+
+def register_rows(rows):
+    """Validates a list of CSV rows and creates the registry record of each one
+    :param rows: list of (line, dict with the CSV_FIELDS)
+    :return: list of (line, record, error), record is None if the row is not valid
+    """
+    validator = patient_validator()
+    results = []
+    for line, row in rows:
+        age = row["age"]
+        # En el CSV todo es texto, la edad se valida como entero; si no lo es validate_patient da "Invalid age"
+        try:
+            age = int(age)
+        except ValueError:
+            pass
+        try:
+            validator.validate_patient(row["patient_id"], row["registration_type"], row["name_surname"],
+                                       row["phone_number"], age)
+        except VaccineManagementException as error:
+            results.append((line, None, error.message))
+            continue
+        vaccine_patient_register = VaccinePatientRegister(row["patient_id"], row["name_surname"],
+                                                          row["registration_type"], row["phone_number"], age)
+        results.append((line, vaccine_patient_register.__dict__(), None))
+    return results
+
+
+def read_csv(path, chunk_size):
+    """Returns the rows of the CSV in chunks of chunk_size (line, row)
+    :raises: ValueError if a column of CSV_FIELDS is missing"""
+    with open(path, "r", encoding="utf-8", newline="") as file:
+        reader = csv.DictReader(file)
+        missing = [field for field in CSV_FIELDS if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError("Missing CSV columns: " + ", ".join(missing))
+        chunks = []
+        chunk = []
+        for row in reader:
+            chunk.append((reader.line_num, {field: row[field] or "" for field in CSV_FIELDS}))
+            if len(chunk) == chunk_size:
+                chunks.append(chunk)
+                chunk = []
+        if chunk:
+            chunks.append(chunk)
+    return chunks
+
+
+def register_chunks(chunks, processes):
+    """Runs register_rows on every chunk, in a pool of processes if there is more than one
+    :return: list of the records of the valid rows and list of (line, message) of the rest
+    """
+    if processes == 1 or len(chunks) <= 1:
+        results = [register_rows(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            results = list(executor.map(register_rows, chunks))
+    records = []
+    errors = []
+    for chunk_results in results:
+        for line, record, error in chunk_results:
+            if record is None:
+                errors.append((line, error))
+            else:
+                records.append(record)
+    return records, errors
+
+
+def import_csv(path, storage, processes=None, chunk_size=2000):
+    """
+    Imports the patients of a CSV into storage in a single write
+    :param path: path of the CSV file
+    :param storage: StorageBackend where the patients are added
+    :param processes: number of processes that validate and hash the rows, by
+    default one per CPU; with 1 everything runs in this process
+    :param chunk_size: number of rows sent to a process at once
+    :return: dict with "rows", "registered", "errors" (list of (line, message))
+    and the seconds of each step: "read_seconds", "register_seconds", "write_seconds"
+    """
+    start = time.perf_counter()
+    chunks = read_csv(path, chunk_size)
+    read_end = time.perf_counter()
+
+    records, errors = register_chunks(chunks, processes)
+    register_end = time.perf_counter()
+
+    if records:
+        storage.add_patients(records)
+    write_end = time.perf_counter()
+    return {"rows": len(records) + len(errors), "registered": len(records), "errors": errors,
+            "read_seconds": read_end - start, "register_seconds": register_end - read_end,
+            "write_seconds": write_end - register_end}
+
+
+def json_storage(folder, registry_format):
+    """Returns the JsonStorage of the files of folder, creating the empty registry if it does not exist"""
+    os.makedirs(folder, exist_ok=True)
+    # Es el mismo fichero en todos los formatos, el de otro formato se convierte al escribir
+    registry = os.path.join(folder, "patient_registry.json")
+    # Un fichero vacio es un registro vacio en cualquier formato
+    with open(registry, "a", encoding="utf-8"):
+        pass
+    # Las citas no se leen al importar, su indice no se llega a cargar
+    return JsonStorage(registry, os.path.join(folder, "vaccination_appointments.json"),
+                       os.path.join(folder, "registered_vaccinations.json"), registry_format)
+
+
+def rate(rows, seconds):
+    """Returns the rows per second of a step"""
+    return rows / seconds if seconds > 0 else float("inf")
+
+
+def main(argv=None):
+    """Entry point of the uc3m_care_import command, returns the exit code"""
+    parser = argparse.ArgumentParser(prog="uc3m_care_import", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("csv", help="CSV file with the patients")
+    parser.add_argument("--db", default=VaccineManager.json_store,
+                        help="folder of the JSON stores (default: %(default)s)")
+    parser.add_argument("--registry-format", default=JSON_FORMAT, choices=STORE_FORMATS,
+                        help="layout of the patient registry (default: %(default)s)")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="processes that validate and hash the rows (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="rows sent to a process at once")
+    parser.add_argument("--max-errors", type=int, default=20, help="rejected rows printed")
+    arguments = parser.parse_args(argv)
+
+    try:
+        storage = json_storage(arguments.db, arguments.registry_format)
+        stats = import_csv(arguments.csv, storage, arguments.processes, arguments.chunk_size)
+    except (OSError, ValueError) as error:
+        print("uc3m_care_import: " + str(error), file=sys.stderr)
+        return 2
+
+    for line, error in stats["errors"][:arguments.max_errors]:
+        print(f"line {line}: {error}", file=sys.stderr)
+    total = stats["read_seconds"] + stats["register_seconds"] + stats["write_seconds"]
+    print(f"read      {stats['rows']:8d} rows     in {stats['read_seconds']:8.3f} s "
+          f"({rate(stats['rows'], stats['read_seconds']):.0f} rows/s)")
+    print(f"validated {stats['rows']:8d} rows     in {stats['register_seconds']:8.3f} s "
+          f"({rate(stats['rows'], stats['register_seconds']):.0f} rows/s), {len(stats['errors'])} rejected")
+    print(f"wrote     {stats['registered']:8d} patients in {stats['write_seconds']:8.3f} s "
+          f"({rate(stats['registered'], stats['write_seconds']):.0f} rows/s)")
+    print(f"total     {stats['rows']:8d} rows     in {total:8.3f} s ({rate(stats['rows'], total):.0f} rows/s)")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
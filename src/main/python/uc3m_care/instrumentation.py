@@ -0,0 +1,220 @@
+"""Contains the class Instrumentation, the hooks that measure the operations of
+VaccineManager, and the class MetricsCollector"""
+import os
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+RECORDS_SCANNED = "records_scanned"
+BYTES_READ = "bytes_read"
+BYTES_WRITTEN = "bytes_written"
+CACHE_HITS = "cache_hits"
+TOTAL_PHASE = "total"
+
+PhaseMetrics = namedtuple("PhaseMetrics", ["operation", "phase", "seconds", "calls", "counters", "ok"])
+PhaseMetrics.__doc__ = """Time and counters of one phase in one call to an operation
+ - operation: name of the public method of VaccineManager
+ - phase: name of the phase, "total" for the whole operation
+ - seconds: time spent in the phase, adding every time it was entered
+ - calls: number of times the phase was entered
+ - counters: dict counter -> value added during the phase ("total" has all of them)
+ - ok: False if the operation raised an exception"""
+
+# Operacion que se esta midiendo en este hilo o tarea, None si no hay ninguna
+_current = ContextVar("uc3m_care_instrumentation", default=None)
+
+
+class _Operation:
+    """Phases measured in one call to an operation"""
+    __slots__ = ("name", "phases", "stack")
+
+    def __init__(self, name):
+        self.name = name
+        # fase -> [segundos, llamadas, contadores]
+        self.phases = {TOTAL_PHASE: [0.0, 1, {}]}
+        self.stack = [TOTAL_PHASE]
+
+    @contextmanager
+    def measure(self, name):
+        """Adds the time spent inside the block to the phase name"""
+        totals = self.phases.setdefault(name, [0.0, 0, {}])
+        totals[1] += 1
+        self.stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            totals[0] += time.perf_counter() - start
+            self.stack.pop()
+
+    def count(self, counter, value):
+        """Adds value to counter in the current phase and in the total"""
+        current = self.stack[-1]
+        for name in (current, TOTAL_PHASE) if current != TOTAL_PHASE else (TOTAL_PHASE,):
+            counters = self.phases[name][2]
+            counters[counter] = counters.get(counter, 0) + value
+
+
+@contextmanager
+def _nothing():
+    """Block that is not measured"""
+    yield
+
+
+def phase(name):
+    """Returns a context manager that measures a block as the phase name of the
+    operation being measured, and does nothing if there is none.
+    Phases can be nested, the counters go to the innermost one"""
+    operation = _current.get()
+    if operation is None:
+        return _nothing()
+    return operation.measure(name)
+
+
+def count(counter, value=1):
+    """Adds value to counter in the current phase of the operation being measured,
+    it does nothing if there is none"""
+    operation = _current.get()
+    if operation is not None:
+        operation.count(counter, value)
+
+
+class Instrumentation:
+    """Class that measures the operations of a VaccineManager
+
+    Every operation is split in phases (validation, hashing, storage_write...)
+    and the stores add counters to the current phase (records_scanned,
+    bytes_read, bytes_written). When the operation ends every callback is
+    called once per phase with a PhaseMetrics, including a "total" phase with
+    the whole operation. Without callbacks nothing is measured.
+
+    The operation being measured is kept in a context variable, so each
+    thread or asyncio task measures its own calls.
+    """
+
+    def __init__(self, *callbacks):
+        """
+        :param callbacks: functions called with a PhaseMetrics, like a MetricsCollector
+        """
+        self.__callbacks = list(callbacks)
+
+    def add_callback(self, callback):
+        """Registers a function that is called with every PhaseMetrics"""
+        self.__callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        """Unregisters a function added with add_callback"""
+        self.__callbacks.remove(callback)
+
+    @contextmanager
+    def operation(self, name):
+        """Measures the block as one call to the operation name"""
+        if not self.__callbacks or _current.get() is not None:
+            # Una operacion que llama a otra se mide solo una vez
+            yield
+            return
+        operation = _Operation(name)
+        token = _current.set(operation)
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            yield
+            succeeded = True
+        finally:
+            operation.phases[TOTAL_PHASE][0] = time.perf_counter() - start
+            _current.reset(token)
+            for phase_name, (seconds, calls, counters) in operation.phases.items():
+                metrics = PhaseMetrics(name, phase_name, seconds, calls, counters, succeeded)
+                for callback in list(self.__callbacks):
+                    callback(metrics)
+
+
+NO_INSTRUMENTATION = Instrumentation()
+
+
+class MetricsCollector:
+    """Callback for Instrumentation that adds up the metrics of every call and
+    exports them in the Prometheus text format
+
+    The operation metrics come from the "total" phase and the phase metrics
+    from the rest, so adding the phases of an operation never counts the same
+    time twice. write_prometheus writes a file that the textfile collector of
+    node_exporter can read.
+    """
+
+    PREFIX = "uc3m_care"
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__operations = {}
+        self.__phases = {}
+
+    def __call__(self, metrics):
+        with self.__lock:
+            if metrics.phase == TOTAL_PHASE:
+                totals = self.__operations.setdefault(metrics.operation, [0.0, 0, 0, {}])
+                if not metrics.ok:
+                    totals[2] += 1
+            else:
+                totals = self.__phases.setdefault((metrics.operation, metrics.phase), [0.0, 0, {}])
+            totals[0] += metrics.seconds
+            totals[1] += metrics.calls
+            for counter, value in metrics.counters.items():
+                totals[-1][counter] = totals[-1].get(counter, 0) + value
+
+    def operations(self):
+        """Returns a dict operation -> {"seconds", "calls", "errors", counters...}"""
+        with self.__lock:
+            return {operation: dict(counters, seconds=seconds, calls=calls, errors=errors)
+                    for operation, (seconds, calls, errors, counters) in self.__operations.items()}
+
+    def phases(self):
+        """Returns a dict (operation, phase) -> {"seconds", "calls", counters...}"""
+        with self.__lock:
+            return {key: dict(counters, seconds=seconds, calls=calls)
+                    for key, (seconds, calls, counters) in self.__phases.items()}
+
+    def prometheus_text(self):
+        """Returns the metrics in the Prometheus text exposition format"""
+        lines = []
+        families = {}
+        for operation, values in sorted(self.operations().items()):
+            for name, value in values.items():
+                family = self.__family("operation", name)
+                families.setdefault(family, []).append(({"operation": operation}, value))
+        for (operation, phase_name), values in sorted(self.phases().items()):
+            for name, value in values.items():
+                family = self.__family("phase", name)
+                families.setdefault(family, []).append(({"operation": operation, "phase": phase_name}, value))
+        for family, samples in families.items():
+            lines.append(f"# TYPE {family} counter")
+            for labels, value in samples:
+                label_text = ",".join(f'{label}="{self.__escape(label_value)}"'
+                                      for label, label_value in labels.items())
+                lines.append(f"{family}{{{label_text}}} {value!r}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Writes prometheus_text() to path, replacing it atomically"""
+        folder, name = os.path.split(os.path.abspath(path))
+        descriptor, temp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                file.write(self.prometheus_text())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def __family(self, level, name):
+        """Returns the name of the metric family of a value of an operation or a phase"""
+        return f"{self.PREFIX}_{level}_{name}_total"
+
+    @staticmethod
+    def __escape(value):
+        """Escapes a label value of the text format"""
+        return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
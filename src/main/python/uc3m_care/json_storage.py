@@ -0,0 +1,113 @@
+"""Contains the class JsonStorage"""
+from uc3m_care.json_store import JsonStore, JSON_FORMAT
+from uc3m_care.json_store_index import JsonStoreIndex
+from uc3m_care.storage_backend import StorageBackend, patient_id_key
+from uc3m_care.wal_store import WalStore
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+
+
+class JsonStorage(StorageBackend):
+    """Storage that keeps every kind of record in its own JSON file
+
+    This is the default storage of VaccineManager. Patients and appointments
+    are looked up through in-process indexes over the files, and the
+    appointments of a range of days through an index that keeps them by
+    vaccine_date, loaded the first time it is used (see StreamingJsonStorage
+    for the lookup without the index of signatures).
+    registry_format is the layout of the patient registry and store_format
+    the one of the appointments and administrations (see JsonStore). With
+    write_ahead_log every file is a WalStore, new records go to a log next to
+    the file and are folded into it from time to time."""
+
+    # Sin indice de firmas las citas se buscan leyendo el fichero por partes
+    index_appointments = True
+
+    def __init__(self, patient_registry, vaccination_appointments, registered_vaccinations,
+                 registry_format=JSON_FORMAT, store_format=JSON_FORMAT, write_ahead_log=False):
+        store_class = WalStore if write_ahead_log else JsonStore
+        self.__patient_store = store_class(patient_registry, registry_format)
+        self.__patient_index = JsonStoreIndex(self.__patient_store, "patient_system_id")
+        # Solo se carga si se busca por patient_id
+        self.__patient_id_index = JsonStoreIndex(self.__patient_store, "patient_id", normalize=patient_id_key)
+        self.__appointment_store = store_class(vaccination_appointments, store_format)
+        self.__appointment_index = None
+        if self.index_appointments:
+            self.__appointment_index = JsonStoreIndex(self.__appointment_store, "date_signature",
+                                                      self.validate_appointment_format)
+        # Solo se carga si se buscan citas por fecha
+        self.__appointment_date_index = JsonStoreIndex(self.__appointment_store, "vaccine_date",
+                                                       self.validate_appointment_format, unique=False)
+        self.__administration_store = store_class(registered_vaccinations, store_format)
+
+    @staticmethod
+    def validate_appointment_format(appointment):
+        """
+        Validates the keys of an appointment read from vaccination_appointments
+        :param appointment: appointment to validate (dict)
+        :raises: VaccineManagementException: If the keys are not the expected ones
+        """
+        if list(appointment.keys()) != ["patient_id", "phone_number", "vaccine_date", "patient_system_id", "date_signature"]:
+            raise VaccineManagementException("Invalid appointments JSON format")
+
+    def add_patients(self, records):
+        states = self.__patient_store.extend(records)
+        self.__patient_index.update(records, states)
+        self.__patient_id_index.update(records, states)
+
+    def find_patient(self, patient_system_id):
+        return self.__patient_index.get(patient_system_id)
+
+    def find_patient_by_id(self, patient_id):
+        return self.__patient_id_index.get(patient_id)
+
+    def iter_patients(self):
+        return self.__patient_store.iter_records()
+
+    def add_appointments(self, records):
+        states = self.__appointment_store.extend(records)
+        if self.__appointment_index is not None:
+            self.__appointment_index.update(records, states)
+        self.__appointment_date_index.update(records, states)
+
+    def find_appointment(self, date_signature):
+        if self.__appointment_index is not None:
+            return self.__appointment_index.get(date_signature)
+        for appointment in self.__appointment_store.iter_records():
+            self.validate_appointment_format(appointment)
+            if appointment["date_signature"] == date_signature:
+                return appointment
+        return None
+
+    def find_appointments(self, date_signatures):
+        if self.__appointment_index is not None:
+            return super().find_appointments(date_signatures)
+        # Sin indice se busca en una sola pasada por el fichero, no una por firma
+        pending = set(date_signatures)
+        appointments = {}
+        if not pending:
+            return appointments
+        for appointment in self.__appointment_store.iter_records():
+            self.validate_appointment_format(appointment)
+            if appointment["date_signature"] in pending:
+                pending.remove(appointment["date_signature"])
+                appointments[appointment["date_signature"]] = appointment
+                if not pending:
+                    break
+        return appointments
+
+    def appointments_between(self, start, end):
+        return self.__appointment_date_index.between(start, end)
+
+    def add_administrations(self, records):
+        self.__administration_store.extend(records)
+
+
+class StreamingJsonStorage(JsonStorage):
+    """JsonStorage without the index of appointments by signature
+
+    find_appointment reads the appointments file as a stream and stops at the
+    first match, and find_appointments reads it once for the whole list, so
+    memory does not grow with the size of the file. It is meant for stores
+    too big to index, or processes that only look up a few appointments."""
+
+    index_appointments = False
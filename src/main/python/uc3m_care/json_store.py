@@ -0,0 +1,435 @@
+"""Contains the class JsonStore"""
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+
+from uc3m_care.instrumentation import count, RECORDS_SCANNED, BYTES_READ, BYTES_WRITTEN, CACHE_HITS
+from uc3m_care.read_cache import READ_CACHE, copy_record, copy_records
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no hay fcntl, las escrituras siguen siendo atomicas pero no se bloquean
+    fcntl = None
+
+try:
+    import msgpack
+except ImportError:
+    # Sin msgpack solo se pueden usar los formatos de texto
+    msgpack = None
+
+JSON_FORMAT = "json"
+JSON_LINES_FORMAT = "jsonl"
+COMPACT_FORMAT = "compact"
+MSGPACK_FORMAT = "msgpack"
+
+STORE_FORMATS = [JSON_FORMAT, JSON_LINES_FORMAT, COMPACT_FORMAT, MSGPACK_FORMAT]
+APPENDABLE_FORMATS = [JSON_LINES_FORMAT, MSGPACK_FORMAT]
+ARRAY_FORMATS = [JSON_FORMAT, COMPACT_FORMAT]
+# Primer byte de un mapa en msgpack (fixmap, map 16 y map 32)
+MSGPACK_MAP_MARKERS = set(range(0x80, 0x90)) | {0xde, 0xdf}
+
+
+class JsonStore:
+    """Class representing a file that stores a list of records
+
+    Four layouts are supported:
+     - "json": the whole list is a JSON array (indent=2), rewritten on every write
+     - "compact": the same JSON array without any whitespace
+     - "jsonl": JSON Lines, one record per line, new records are appended
+     - "msgpack": records packed one after the other with msgpack, new records
+       are appended (needs the msgpack package)
+
+    The layout of the file is detected when it is read, so a store can read a
+    file written in any of them. The first write to a file in another layout
+    converts the whole file to the layout of the store.
+
+    Writes are done holding an advisory lock on "<path>.lock", so several
+    processes can share the same store without losing records. JSON arrays
+    are written to a temporary file that replaces the store when it is
+    complete, so readers never see a half written file. In the appendable
+    layouts a record left half written by a writer that crashed is cut
+    before the next records are appended.
+
+    The records read are kept in a ReadCache while the file does not change,
+    so reading an unchanged file again does not parse it. The cache keeps its
+    own copy, so changing the records returned never changes the file.
+    """
+
+    def __init__(self, path, store_format=JSON_FORMAT, read_cache=READ_CACHE):
+        """
+        :param path: path of the store file
+        :param store_format: layout of the file ("json", "compact", "jsonl" or "msgpack")
+        :param read_cache: ReadCache of the records read, by default the one shared
+        by every store of the process; None to parse the file on every read
+        """
+        if store_format not in STORE_FORMATS:
+            raise ValueError("Invalid store format: " + str(store_format))
+        if store_format == MSGPACK_FORMAT and msgpack is None:
+            raise ValueError("The msgpack store format needs the msgpack package")
+        self.__path = path
+        self.__format = store_format
+        self.__read_cache = read_cache
+        # Estado del fichero tras el ultimo registro añadido por este almacen, termina en un registro completo
+        self.__appended = None
+
+    @property
+    def path(self):
+        """Property that represents the path of the store file"""
+        return self.__path
+
+    @property
+    def store_format(self):
+        """Property that represents the layout of the store file"""
+        return self.__format
+
+    @property
+    def appendable(self):
+        """Property that is True if new records are appended to the file"""
+        return self.__format in APPENDABLE_FORMATS
+
+    def file_format(self):
+        """Returns the layout of the file on disk, detected from its first byte
+        ("[" JSON array, "{" JSON Lines, a msgpack map marker msgpack).
+        The layout of the store is returned if the file is empty
+        :raises: FileNotFoundError if the file does not exist"""
+        with open(self.__path, "rb") as file:
+            file_format = self.__detect_format(file)
+        return self.__format if file_format is None else file_format
+
+    def __detect_format(self, file):
+        """Returns the layout of the open binary file, None if it is empty"""
+        while True:
+            chunk = file.read(4096)
+            if not chunk:
+                return None
+            head = chunk.lstrip()
+            if head:
+                break
+        if head[:1] == b"[":
+            # Con indentacion o sin ella se lee igual
+            return self.__format if self.__format in ARRAY_FORMATS else JSON_FORMAT
+        if head[:1] == b"{":
+            return JSON_LINES_FORMAT
+        if head[0] in MSGPACK_MAP_MARKERS:
+            return MSGPACK_FORMAT
+        # No es ningun formato conocido, al leerlo como JSON se obtiene el error
+        return JSON_FORMAT
+
+    def load(self):
+        """Returns the list of records of the store
+        :raises: FileNotFoundError if the file does not exist
+        :raises: json.JSONDecodeError if the content is not valid"""
+        # El estado se mira antes de leer: si el fichero cambia mientras, no coincidira
+        state = self.state()
+        cached = self.__cached(state)
+        if cached is not None:
+            return cached
+        file_format = self.file_format()
+        if file_format in APPENDABLE_FORMATS:
+            records = self.load_from(0)[0]
+        else:
+            with open(self.__path, "rb") as file:
+                content = file.read()
+            records = json.loads(content.decode("utf-8"))
+            count(BYTES_READ, len(content))
+            count(RECORDS_SCANNED, len(records))
+        if self.__read_cache is not None:
+            self.__read_cache.put(self.__path, state, records)
+        return records
+
+    def __cached(self, state, copy=True):
+        """Returns the cached records of the file if it still has state, None otherwise"""
+        if self.__read_cache is None:
+            return None
+        cached = self.__read_cache.get(self.__path, state, copy)
+        if cached is not None:
+            count(CACHE_HITS)
+        return cached
+
+    def iter_records(self, chunk_size=65536, copy=True):
+        """Yields the records of the store one by one while the file is read,
+        so the whole file is never held in memory. With copy=False the records
+        of a cached file are the ones of the cache, they must not be modified
+        :raises: FileNotFoundError if the file does not exist
+        :raises: json.JSONDecodeError if the content is not valid"""
+        cached = self.__cached(self.state(), copy=False)
+        if cached is not None:
+            # Se copia cada registro al devolverlo, no la lista entera antes del primero
+            for record in cached:
+                yield copy_record(record) if copy else record
+            return
+        file_format = self.file_format()
+        if file_format == MSGPACK_FORMAT:
+            file = open(self.__path, "rb")
+            raw_file = file
+        else:
+            file = open(self.__path, "r", encoding="utf-8")
+            raw_file = file.buffer
+        scanned = 0
+        with file:
+            try:
+                for record in self.__read_records(file, file_format, chunk_size):
+                    scanned += 1
+                    yield record
+            finally:
+                # Tambien si se deja de leer antes del final, como al buscar un registro
+                count(RECORDS_SCANNED, scanned)
+                count(BYTES_READ, raw_file.tell())
+
+    def __read_records(self, file, file_format, chunk_size):
+        """Yields the records of the open file in the layout file_format"""
+        if file_format == MSGPACK_FORMAT:
+            # Un registro que se esta escribiendo no se devuelve hasta que esta completo
+            yield from self.__unpacker(file, chunk_size)
+            return
+        if file_format == JSON_LINES_FORMAT:
+            for line in file:
+                # Una linea sin "\n" final todavia se esta escribiendo
+                if line.endswith("\n") and line.strip():
+                    yield json.loads(line)
+            return
+        yield from self.__iter_array(file, chunk_size)
+
+    @staticmethod
+    def __iter_array(file, chunk_size):
+        """Yields the elements of the JSON array of file, reading it in chunks"""
+        decoder = json.JSONDecoder()
+        buffer = ""
+        position = 0
+
+        def read_more():
+            """Drops the text already parsed and adds a new chunk, False at the end of the file"""
+            nonlocal buffer, position
+            chunk = file.read(chunk_size)
+            buffer = buffer[position:] + chunk
+            position = 0
+            return chunk != ""
+
+        def next_char(separators):
+            """Skips the separators and returns the next character, "" at the end of the file"""
+            nonlocal position
+            while True:
+                while position < len(buffer) and buffer[position] in separators:
+                    position += 1
+                if position < len(buffer):
+                    return buffer[position]
+                if not read_more():
+                    return ""
+
+        if next_char(" \t\r\n") != "[":
+            raise json.JSONDecodeError("Expecting '['", buffer, position)
+        position += 1
+        separators = " \t\r\n"
+        while True:
+            char = next_char(separators)
+            if char == "]":
+                return
+            if char == "":
+                raise json.JSONDecodeError("Expecting ']'", buffer, position)
+            try:
+                record, end = decoder.raw_decode(buffer, position)
+                # Si el elemento llega hasta el final del trozo puede continuar en el siguiente
+                complete = end < len(buffer)
+            except json.JSONDecodeError:
+                complete = False
+            if not complete:
+                if read_more():
+                    continue
+                record, end = decoder.raw_decode(buffer, position)
+            position = end
+            separators = " \t\r\n,"
+            yield record
+
+    @staticmethod
+    def __unpacker(file=None, chunk_size=65536):
+        """Returns a msgpack Unpacker that reads from file, or from feed() if file is None
+        :raises: ValueError if msgpack is not installed"""
+        if msgpack is None:
+            raise ValueError("The msgpack store format needs the msgpack package")
+        return msgpack.Unpacker(file, raw=False, read_size=chunk_size)
+
+    def __decode_appended(self, content, file_format):
+        """Returns the complete records of the bytes of an appendable layout,
+        together with the number of bytes they take up"""
+        if file_format == MSGPACK_FORMAT:
+            unpacker = self.__unpacker()
+            unpacker.feed(content)
+            records = []
+            end = 0
+            for record in unpacker:
+                records.append(record)
+                # Un registro que se esta escribiendo no cuenta, tell() lo incluiria
+                end = unpacker.tell()
+            return records, end
+        # Una linea sin "\n" final todavia se esta escribiendo, se deja para luego
+        end = content.rfind(b"\n") + 1
+        records = [json.loads(line) for line in content[:end].splitlines() if line.strip()]
+        return records, end
+
+    def load_from(self, offset):
+        """Returns the records of an appendable store written from offset on,
+        together with the offset where the next unread record starts"""
+        file_format = self.file_format()
+        with open(self.__path, "rb") as file:
+            file.seek(offset)
+            content = file.read()
+        records, end = self.__decode_appended(content, file_format)
+        count(BYTES_READ, len(content))
+        count(RECORDS_SCANNED, len(records))
+        return records, offset + end
+
+    def state(self):
+        """Returns (inode, size, mtime) of the file, None if it does not exist"""
+        try:
+            stat = os.stat(self.__path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def append(self, record):
+        """Adds one record at the end of the store
+        :return: states of the file just before and just after the write"""
+        return self.extend([record])
+
+    def extend(self, records):
+        """Adds a list of records at the end of the store in a single write
+        :return: states of the file just before and just after the write"""
+        with self.lock():
+            before = self.state()
+            try:
+                with open(self.__path, "rb") as file:
+                    file_format = self.__detect_format(file)
+            except FileNotFoundError:
+                if not self.appendable:
+                    raise
+                # Si se añade al final, el fichero se crea al escribir
+                file_format = self.__format
+            if self.appendable and file_format == self.__format:
+                # Solo se escriben los registros nuevos, el resto del fichero no se toca
+                if file_format is not None and self.drop_partial_record():
+                    before = self.state()
+                content = self.__encode(records)
+                if self.__read_cache is not None:
+                    self.__read_cache.discard(self.__path)
+                with open(self.__path, "ab") as file:
+                    file.write(content)
+                    file.flush()
+                    os.fsync(file.fileno())
+                count(BYTES_WRITTEN, len(content))
+                self.__appended = self.state()
+            else:
+                # Un fichero vacio se considera una lista vacia, uno en otro formato se convierte
+                data = self.__records_to_extend(before) if file_format is not None else []
+                # La lista nueva pasa a la cache, con una copia de los registros del llamador
+                data.extend(copy_records(records) if self.__read_cache is not None else records)
+                self.__replace(data, cache_copy=False)
+            return before, self.state()
+
+    def __records_to_extend(self, state):
+        """Returns a new list with the records of the file, that has state, to add
+        records to it. The cached records are not copied, they are only written"""
+        cached = self.__cached(state, copy=False)
+        if cached is not None:
+            return list(cached)
+        return self.load()
+
+    def drop_partial_record(self, chunk_size=65536):
+        """Cuts the record left half written at the end of an appendable file by a
+        writer that crashed, so the next record does not start in the middle of it.
+        The caller must hold lock()
+        :return: True if the file has been cut"""
+        state = self.state()
+        # Si nadie ha escrito desde el ultimo registro de este almacen, no hay nada a medias
+        if state is None or state == self.__appended:
+            return False
+        size = state[1]
+        if self.file_format() == MSGPACK_FORMAT:
+            end = self.__msgpack_end(chunk_size)
+        else:
+            end = self.__lines_end(size, chunk_size)
+        if end == size:
+            return False
+        with open(self.__path, "rb+") as file:
+            file.truncate(end)
+            file.flush()
+            os.fsync(file.fileno())
+        if self.__read_cache is not None:
+            self.__read_cache.discard(self.__path)
+        return True
+
+    def __lines_end(self, size, chunk_size):
+        """Returns the offset after the last "\n" of the file, reading it backwards"""
+        with open(self.__path, "rb") as file:
+            position = size
+            while position > 0:
+                start = max(0, position - chunk_size)
+                file.seek(start)
+                newline = file.read(position - start).rfind(b"\n")
+                if newline >= 0:
+                    return start + newline + 1
+                position = start
+        return 0
+
+    def __msgpack_end(self, chunk_size):
+        """Returns the offset where the last complete msgpack record of the file ends"""
+        # En msgpack no se puede leer hacia atras, se recorre el fichero por partes
+        with open(self.__path, "rb") as file:
+            unpacker = self.__unpacker(file, chunk_size)
+            end = 0
+            for _ in unpacker:
+                end = unpacker.tell()
+        return end
+
+    def __encode(self, records):
+        """Returns the bytes of records in the layout of the store"""
+        if self.__format == MSGPACK_FORMAT:
+            return b"".join(msgpack.packb(record, use_bin_type=True) for record in records)
+        if self.__format == JSON_LINES_FORMAT:
+            return "".join(json.dumps(record) + "\n" for record in records).encode("utf-8")
+        if self.__format == COMPACT_FORMAT:
+            return json.dumps(records, separators=(",", ":")).encode("utf-8")
+        return json.dumps(records, indent=2).encode("utf-8")
+
+    def rewrite(self, records):
+        """Replaces the content of the store with records in a single atomic write.
+        The caller must hold lock()
+        :raises: FileNotFoundError if the file does not exist"""
+        self.__replace(records)
+
+    @contextmanager
+    def lock(self):
+        """Holds the exclusive lock of the store while writing"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.__path + ".lock", "a", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def __replace(self, data, cache_copy=True):
+        """Writes data in a temporary file and renames it over the store.
+        With cache_copy=False data goes to the cache without a copy, nobody may modify it"""
+        folder, name = os.path.split(os.path.abspath(self.__path))
+        descriptor, temp_path = tempfile.mkstemp(prefix=name + ".", suffix=".tmp", dir=folder)
+        try:
+            content = self.__encode(data)
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+                # El fichero nuevo mantiene inodo, tamaño y mtime al renombrarlo
+                stat = os.fstat(file.fileno())
+            count(BYTES_WRITTEN, len(content))
+            os.chmod(temp_path, os.stat(self.__path).st_mode)
+            os.replace(temp_path, self.__path)
+            if self.__read_cache is not None:
+                self.__read_cache.put(self.__path, (stat.st_ino, stat.st_size, stat.st_mtime_ns), data,
+                                      cache_copy)
+        except BaseException:
+            os.remove(temp_path)
+            raise
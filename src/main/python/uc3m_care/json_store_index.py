@@ -0,0 +1,139 @@
+"""Contains the class JsonStoreIndex"""
+from bisect import bisect_left, bisect_right, insort
+
+from uc3m_care.json_store import APPENDABLE_FORMATS
+from uc3m_care.read_cache import copy_record
+
+
+class JsonStoreIndex:
+    """Class representing an in-process hash index over the records of a JsonStore
+
+    The index is built the first time it is used and kept in sync with the
+    records added through update(). If the file is changed by someone else the
+    index notices it (inode, size and mtime of the file) and reloads it; for
+    appendable stores (JSON Lines, msgpack) that only grew, just the new
+    records are read.
+
+    A non unique index keeps every record of a key, in the order they were
+    written, and the keys sorted, so the records of a range of keys are read
+    with between() without looking at the rest.
+
+    The index shares the records with the ReadCache of the store, so it does
+    not copy the file when it is loaded; get() and between() return a copy
+    of each record, that the caller can modify."""
+
+    def __init__(self, store, key, validator=None, unique=True, normalize=None):
+        """
+        :param store: JsonStore with the records to index
+        :param key: field of the records used as key
+        :param validator: optional function called with every record read from
+        the file, it must raise an exception if the record is not valid
+        :param unique: if False the index keeps all the records of each key
+        :param normalize: optional function applied to the keys of the records
+        and to the values looked up, like patient_id_key
+        """
+        self.__store = store
+        self.__key = key
+        self.__validator = validator
+        self.__normalize = normalize
+        self.__records = None
+        # Claves ordenadas en los indices no unicos, None en los unicos
+        self.__keys = None if unique else []
+        self.__state = None
+
+    @property
+    def key(self):
+        """Property that represents the field used as key of the index"""
+        return self.__key
+
+    def get(self, value):
+        """Returns the last record whose key is value, None if there is none"""
+        self.__refresh()
+        if self.__normalize is not None:
+            value = self.__normalize(value)
+        if self.__keys is None:
+            record = self.__records.get(value)
+        else:
+            bucket = self.__records.get(value)
+            record = bucket[-1] if bucket else None
+        return copy_record(record) if record is not None else None
+
+    def between(self, start, end):
+        """Returns a generator of the records whose key is between start and end,
+        both included, ordered by key. Only for non unique indexes. The index is
+        refreshed and the keys are selected in the call, not while it is consumed"""
+        if self.__keys is None:
+            raise ValueError("between() needs a non unique JsonStoreIndex")
+        self.__refresh()
+        buckets = [list(self.__records[key])
+                   for key in self.__keys[bisect_left(self.__keys, start):bisect_right(self.__keys, end)]]
+        return (copy_record(record) for bucket in buckets for record in bucket)
+
+    def __add(self, record):
+        """Adds one record to the index"""
+        key = record[self.__key]
+        if self.__normalize is not None:
+            key = self.__normalize(key)
+        if self.__keys is None:
+            self.__records[key] = record
+        elif key in self.__records:
+            self.__records[key].append(record)
+        else:
+            self.__records[key] = [record]
+            insort(self.__keys, key)
+
+    def __clear(self):
+        """Empties the index, it is filled again with the records of the store"""
+        self.__records = {}
+        if self.__keys is not None:
+            self.__keys = []
+
+    def update(self, records, states):
+        """Adds to the index the records that have just been written to the store,
+        if nobody else has written to it since it was last read
+        :param records: list of records written
+        :param states: states of the file before and after the write, as returned by JsonStore.extend
+        """
+        # Si otro proceso ha escrito desde la ultima lectura, el estado no coincide:
+        # el siguiente __refresh vuelve a cargar el fichero o, en jsonl y msgpack,
+        # lee lo añadido desde la ultima lectura, incluidos estos registros
+        if self.__records is None or states[0] != self.__state:
+            return
+        for record in records:
+            self.__add(record)
+        self.__state = states[1]
+
+    def __refresh(self):
+        """Loads the records of the store that are not indexed yet"""
+        state = self.__store.state()
+        if self.__records is not None and state == self.__state:
+            return
+        # Se mira el formato del fichero, que puede no estar convertido todavia
+        if self.__store.appendable and self.__store.file_format() in APPENDABLE_FORMATS:
+            if not self.__is_appended(state):
+                self.__clear()
+                self.__state = None
+            offset = self.__state[1] if self.__state is not None else 0
+            records, offset = self.__store.load_from(offset)
+            # Se guarda hasta donde se ha leido, por si el fichero crece mientras tanto
+            state = (state[0], offset, state[2])
+        else:
+            # El fichero se lee por partes, sin cargar la lista entera en memoria
+            self.__clear()
+            records = self.__store.iter_records(copy=False)
+        try:
+            for record in records:
+                if self.__validator is not None:
+                    self.__validator(record)
+                self.__add(record)
+        except Exception:
+            # El indice se vuelve a cargar entero la proxima vez
+            self.__records = None
+            self.__state = None
+            raise
+        self.__state = state
+
+    def __is_appended(self, state):
+        """Checks if the only change in the store is a set of appended records"""
+        return self.__state is not None and state is not None \
+            and state[0] == self.__state[0] and state[1] > self.__state[1]
@@ -0,0 +1,85 @@
+"""Contains the class MemoryStorage"""
+from bisect import bisect_left, bisect_right, insort
+
+from uc3m_care.storage_backend import StorageBackend, patient_id_key
+
+
+class _DateIndex:
+    """Appointments grouped by vaccine_date, with the dates in order"""
+
+    def __init__(self):
+        self.__by_date = {}
+        self.__dates = []
+
+    def add(self, record):
+        """Adds an appointment to the bucket of its vaccine_date"""
+        if record["vaccine_date"] not in self.__by_date:
+            self.__by_date[record["vaccine_date"]] = []
+            insort(self.__dates, record["vaccine_date"])
+        self.__by_date[record["vaccine_date"]].append(record)
+
+    def between(self, start, end):
+        """Returns the buckets of the dates from start to end, both included, in order"""
+        dates = self.__dates[bisect_left(self.__dates, start):bisect_right(self.__dates, end)]
+        return [list(self.__by_date[vaccine_date]) for vaccine_date in dates]
+
+
+class MemoryStorage(StorageBackend):
+    """Storage that keeps the records in memory, without touching the disk
+
+    It is meant for tests and benchmarks, the records are lost when the object is destroyed."""
+
+    def __init__(self):
+        self.__patients = []
+        self.__patients_by_system_id = {}
+        self.__patients_by_id = {}
+        self.__appointments = []
+        self.__appointments_by_signature = {}
+        self.__appointments_by_date = _DateIndex()
+        self.__administrations = []
+
+    @property
+    def patients(self):
+        """Property that represents the list of registered patients"""
+        return self.__patients
+
+    @property
+    def appointments(self):
+        """Property that represents the list of vaccination appointments"""
+        return self.__appointments
+
+    @property
+    def administrations(self):
+        """Property that represents the list of registered vaccinations"""
+        return self.__administrations
+
+    def add_patients(self, records):
+        self.__patients.extend(records)
+        for record in records:
+            self.__patients_by_system_id[record["patient_system_id"]] = record
+            self.__patients_by_id[patient_id_key(record["patient_id"])] = record
+
+    def find_patient(self, patient_system_id):
+        return self.__patients_by_system_id.get(patient_system_id)
+
+    def find_patient_by_id(self, patient_id):
+        return self.__patients_by_id.get(patient_id_key(patient_id))
+
+    def iter_patients(self):
+        return iter(self.__patients)
+
+    def add_appointments(self, records):
+        self.__appointments.extend(records)
+        for record in records:
+            self.__appointments_by_signature[record["date_signature"]] = record
+            self.__appointments_by_date.add(record)
+
+    def find_appointment(self, date_signature):
+        return self.__appointments_by_signature.get(date_signature)
+
+    def appointments_between(self, start, end):
+        buckets = self.__appointments_by_date.between(start, end)
+        return (appointment for bucket in buckets for appointment in bucket)
+
+    def add_administrations(self, records):
+        self.__administrations.extend(records)
@@ -0,0 +1,152 @@
+"""Contains the class PatientColumnValidator"""
+try:
+    import numpy as np
+except ImportError:
+    # Sin numpy no se pueden validar columnas, la validacion fila a fila sigue funcionando
+    np = None
+
+VALID = 0
+INVALID_PATIENT_ID = 1
+INVALID_REGISTRATION_TYPE = 2
+INVALID_NAME_SURNAME = 3
+INVALID_PHONE_NUMBER = 4
+INVALID_AGE = 5
+
+ERROR_MESSAGES = {
+    INVALID_PATIENT_ID: "Invalid patient ID",
+    INVALID_REGISTRATION_TYPE: "Invalid registration type",
+    INVALID_NAME_SURNAME: "Invalid name and surname",
+    INVALID_PHONE_NUMBER: "Invalid phone number",
+    INVALID_AGE: "Invalid age",
+}
+
+REGISTRATION_TYPES = ["Regular", "Family"]
+
+
+class PatientColumnValidator:
+    """Class for validating many patients at once, a whole column at a time
+
+    The rules are the ones of VaccineManager.validate_patient and every row
+    gets the error code of the first check that fails there, but the checks
+    are done with NumPy array operations over the columns. Integer and string
+    NumPy arrays can be given as columns and are read as lists of int and str.
+    """
+
+    def __init__(self):
+        if np is None:
+            raise ValueError("PatientColumnValidator needs the numpy package")
+
+    def validate(self, patient_ids, registration_types, names_surnames, phone_numbers, ages):
+        """
+        Validates the columns of a bulk import, all of them with the same length
+        :return: (valid, codes), a boolean array that is True for the valid rows
+        and an array with the error code of every row (VALID if it is valid)
+        :raises: ValueError: If the columns do not have the same length
+        """
+        rows = len(patient_ids)
+        if any(len(column) != rows for column in [registration_types, names_surnames, phone_numbers, ages]):
+            raise ValueError("All the columns must have the same length")
+
+        codes = np.full(rows, VALID, dtype=np.int8)
+        # Se asignan de la ultima comprobacion a la primera, asi queda el codigo de la primera que falla
+        codes[~self.__valid_ages(ages)] = INVALID_AGE
+        codes[~self.__valid_phone_numbers(phone_numbers)] = INVALID_PHONE_NUMBER
+        codes[~self.__valid_names_surnames(names_surnames)] = INVALID_NAME_SURNAME
+        codes[~self.__valid_registration_types(registration_types)] = INVALID_REGISTRATION_TYPE
+        codes[~self.__valid_patient_ids(patient_ids)] = INVALID_PATIENT_ID
+        return codes == VALID, codes
+
+    @staticmethod
+    def messages(codes):
+        """Returns the message of VaccineManagementException of every code, None for the valid rows"""
+        return [ERROR_MESSAGES.get(int(code)) for code in codes]
+
+    @staticmethod
+    def __text_column(values):
+        """Returns (text, lengths, is_str) of a column: a str array with the strings
+        ("" in the other rows), their Python lengths (-1 in the other rows) and
+        whether the value is exactly a str"""
+        if isinstance(values, np.ndarray) and values.dtype.kind == "U":
+            return values, np.char.str_len(values), np.ones(len(values), dtype=bool)
+        values = list(values)
+        rows = len(values)
+        is_str = np.fromiter((type(value) is str for value in values), dtype=bool, count=rows)
+        # Las longitudes se toman de Python, numpy quita los "\0" del final de los textos
+        lengths = np.fromiter((len(value) if isinstance(value, str) else -1 for value in values),
+                              dtype=np.int64, count=rows)
+        text = np.array([value if isinstance(value, str) else "" for value in values], dtype=str)
+        return text, lengths, is_str
+
+    @staticmethod
+    def __code_points(text, rows, width):
+        """Returns a matrix with the code points of the texts of rows, all of them of that width"""
+        return text[rows].astype("U" + str(width)).view(np.uint32).reshape(-1, width)
+
+    @staticmethod
+    def __in_ranges(points, ranges):
+        """Returns True where the code point is in any of the ranges (first, last)"""
+        result = np.zeros(points.shape, dtype=bool)
+        for first, last in ranges:
+            result |= (points >= ord(first)) & (points <= ord(last))
+        return result
+
+    def __valid_patient_ids(self, values):
+        """Same rule as validate_uuid4: a UUID version 4 with hyphens, in any case"""
+        text, lengths, is_str = self.__text_column(values)
+        valid = is_str & (lengths == 36)
+        points = self.__code_points(text, valid, 36)
+        hexadecimal = self.__in_ranges(points, [("0", "9"), ("A", "F"), ("a", "f")])
+        checks = np.ones(len(points), dtype=bool)
+        for position in range(36):
+            if position in [8, 13, 18, 23]:
+                checks &= points[:, position] == ord("-")
+            elif position == 14:
+                checks &= points[:, position] == ord("4")
+            elif position == 19:
+                checks &= self.__in_ranges(points[:, position], [("8", "9"), ("A", "B"), ("a", "b")])
+            else:
+                checks &= hexadecimal[:, position]
+        valid[valid] = checks
+        return valid
+
+    def __valid_registration_types(self, values):
+        """Same rule as validate_patient: Regular or Family"""
+        text, lengths, _ = self.__text_column(values)
+        valid = np.zeros(len(text), dtype=bool)
+        for registration_type in REGISTRATION_TYPES:
+            valid |= (text == registration_type) & (lengths == len(registration_type))
+        return valid
+
+    def __valid_names_surnames(self, values):
+        """Same rule as validate_patient: a str of 1 to 30 characters with a space"""
+        text, lengths, is_str = self.__text_column(values)
+        return is_str & (lengths > 0) & (lengths <= 30) & (np.char.find(text, " ") >= 0)
+
+    def __valid_phone_numbers(self, values):
+        """Same rule as validate_patient: a str of 9 characters that int() accepts"""
+        if not isinstance(values, np.ndarray):
+            values = list(values)
+        text, lengths, is_str = self.__text_column(values)
+        candidates = is_str & (lengths == 9)
+        digits = self.__in_ranges(self.__code_points(text, candidates, 9), [("0", "9")]).all(axis=1)
+        valid = candidates.copy()
+        valid[candidates] = digits
+        # Lo que no son 9 cifras ASCII (signos, espacios, "_", otras cifras) lo decide int() como en validate_patient
+        for row in np.flatnonzero(candidates & ~valid):
+            try:
+                int(values[row])
+                valid[row] = True
+            except ValueError:
+                pass
+        return valid
+
+    @staticmethod
+    def __valid_ages(values):
+        """Same rule as validate_patient: an int between 6 and 125"""
+        if isinstance(values, np.ndarray) and values.dtype.kind in "iu":
+            return (values >= 6) & (values <= 125)
+        values = list(values)
+        # Los int fuera de rango de int64 tampoco son validos, se cambian por -1
+        ages = np.fromiter((value if type(value) is int and -2 ** 63 < value < 2 ** 63 else -1
+                            for value in values), dtype=np.int64, count=len(values))
+        return (ages >= 6) & (ages <= 125)
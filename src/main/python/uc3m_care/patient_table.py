@@ -0,0 +1,281 @@
+"""Contains the class PatientTable"""
+import uuid
+from array import array
+
+PATIENT_FIELDS = ["patient_id", "name_surname", "registration_type", "phone_number",
+                  "age", "time_stamp", "patient_system_id"]
+
+
+def _pack_uuid(value):
+    """Returns the 16 bytes of a UUID, None if it is not written as str(uuid.UUID) writes it"""
+    if type(value) != str:
+        return None
+    try:
+        packed = uuid.UUID(value).bytes
+    except ValueError:
+        return None
+    return packed if str(uuid.UUID(bytes=packed)) == value else None
+
+
+def _pack_md5(value):
+    """Returns the 16 bytes of a MD5 hex digest, None if it is not a lower case digest"""
+    if type(value) != str:
+        return None
+    try:
+        packed = bytes.fromhex(value)
+    except ValueError:
+        return None
+    return packed if len(packed) == 16 and packed.hex() == value else None
+
+
+def _pack_phone_number(value):
+    """Returns the 9 digits of a phone number as an int, None if they are not 9 ASCII digits"""
+    if type(value) != str or len(value) != 9 or not value.isascii() or not value.isdigit():
+        return None
+    return int(value)
+
+
+def _pack_age(value):
+    """Returns an age that fits in a byte, None if it does not"""
+    return value if type(value) == int and 0 <= value <= 255 else None
+
+
+def _pack_time_stamp(value):
+    """Returns a float time stamp, None if it is not a float"""
+    return value if type(value) == float else None
+
+
+class _BytesColumn:
+    """Column of 16 byte values, one after the other"""
+
+    def __init__(self, pack, unpack):
+        self.__data = bytearray()
+        self.pack = pack
+        self.__unpack = unpack
+
+    @property
+    def nbytes(self):
+        """Property that represents the bytes taken by the column"""
+        return len(self.__data)
+
+    def append(self, packed):
+        """Adds a value returned by pack"""
+        self.__data += packed
+
+    def append_empty(self):
+        """Adds the row of a record that is not kept in the columns"""
+        self.__data += bytes(16)
+
+    def get(self, row):
+        """Returns the value of row"""
+        return self.__unpack(bytes(self.__data[row * 16:row * 16 + 16]))
+
+    def last_row(self, value, skip):
+        """Returns the last row with value that is not in skip, -1 if there is none"""
+        key = self.pack(value)
+        if key is None:
+            return -1
+        # Se busca desde el final, solo valen las posiciones donde empieza una fila
+        position = self.__data.rfind(key)
+        while position != -1 and (position % 16 != 0 or position // 16 in skip):
+            position = self.__data.rfind(key, 0, position + 15)
+        return position // 16 if position != -1 else -1
+
+
+class _TextColumn:
+    """Column of UTF-8 strings, one after the other"""
+
+    def __init__(self):
+        self.__data = bytearray()
+        # Donde acaba cada valor, con 32 bits caben 4 GiB de texto
+        self.__ends = array("I")
+
+    @property
+    def nbytes(self):
+        """Property that represents the bytes taken by the column"""
+        return len(self.__data) + self.__ends.itemsize * len(self.__ends)
+
+    @staticmethod
+    def pack(value):
+        """Returns the UTF-8 bytes of value, None if it is not a str"""
+        return value.encode("utf-8") if type(value) == str else None
+
+    def append(self, packed):
+        """Adds a value returned by pack"""
+        self.__data += packed
+        self.__ends.append(len(self.__data))
+
+    def append_empty(self):
+        """Adds the row of a record that is not kept in the columns"""
+        self.__ends.append(len(self.__data))
+
+    def get(self, row):
+        """Returns the value of row"""
+        start = self.__ends[row - 1] if row > 0 else 0
+        return self.__data[start:self.__ends[row]].decode("utf-8")
+
+
+class _CategoryColumn:
+    """Column of a few distinct strings, kept as a byte code per row"""
+
+    def __init__(self):
+        self.__categories = []
+        self.__codes = {}
+        self.__rows = array("B")
+
+    @property
+    def nbytes(self):
+        """Property that represents the bytes taken by the column"""
+        return self.__rows.itemsize * len(self.__rows)
+
+    def pack(self, value):
+        """Returns value, None if it is not a str or there is no code left for it"""
+        if type(value) != str or (value not in self.__codes and len(self.__categories) == 256):
+            return None
+        return value
+
+    def append(self, packed):
+        """Adds a value returned by pack"""
+        if packed not in self.__codes:
+            self.__codes[packed] = len(self.__categories)
+            self.__categories.append(packed)
+        self.__rows.append(self.__codes[packed])
+
+    def append_empty(self):
+        """Adds the row of a record that is not kept in the columns"""
+        self.__rows.append(0)
+
+    def get(self, row):
+        """Returns the value of row"""
+        return self.__categories[self.__rows[row]]
+
+
+class _ArrayColumn:
+    """Column of numbers kept in an array"""
+
+    def __init__(self, typecode, pack, unpack=None):
+        self.__values = array(typecode)
+        self.pack = pack
+        self.__unpack = unpack
+
+    @property
+    def nbytes(self):
+        """Property that represents the bytes taken by the column"""
+        return self.__values.itemsize * len(self.__values)
+
+    def append(self, packed):
+        """Adds a value returned by pack"""
+        self.__values.append(packed)
+
+    def append_empty(self):
+        """Adds the row of a record that is not kept in the columns"""
+        self.__values.append(0)
+
+    def get(self, row):
+        """Returns the value of row"""
+        if self.__unpack is None:
+            return self.__values[row]
+        return self.__unpack(self.__values[row])
+
+    def tolist(self):
+        """Returns the values of all the rows, only for columns without unpack"""
+        return self.__values.tolist()
+
+
+class PatientTable:
+    """Class representing the patient registry in memory as packed columns
+
+    Every column is kept in a fixed width array instead of a dict per patient:
+     - patient_id and patient_system_id: the 16 bytes of the UUID and of the MD5
+     - name_surname: the UTF-8 bytes of all the names one after the other
+     - registration_type: a code per row of the list of types seen
+     - phone_number: the 9 digits as a 32 bit number
+     - age and time_stamp: a byte and a double
+
+    A record that does not fit in the columns (other keys, types or formats,
+    like an upper case UUID) is kept as it is, so every record is returned
+    exactly as it was added.
+    """
+
+    def __init__(self, records=()):
+        """
+        :param records: iterable of patient registry records to add
+        """
+        self.__columns = {
+            "patient_id": _BytesColumn(_pack_uuid, lambda packed: str(uuid.UUID(bytes=packed))),
+            "name_surname": _TextColumn(),
+            "registration_type": _CategoryColumn(),
+            "phone_number": _ArrayColumn("I", _pack_phone_number, lambda packed: f"{packed:09d}"),
+            "age": _ArrayColumn("B", _pack_age),
+            "time_stamp": _ArrayColumn("d", _pack_time_stamp),
+            "patient_system_id": _BytesColumn(_pack_md5, bytes.hex),
+        }
+        self.__rows = 0
+        self.__others = {}
+        self.extend(records)
+
+    def __len__(self):
+        return self.__rows
+
+    def __iter__(self):
+        for row in range(len(self)):
+            yield self.record(row)
+
+    @property
+    def nbytes(self):
+        """Property that represents the bytes taken by the packed columns"""
+        return sum(column.nbytes for column in self.__columns.values())
+
+    def extend(self, records):
+        """Adds the records at the end of the table"""
+        for record in records:
+            self.append(record)
+
+    def append(self, record):
+        """Adds one patient registry record at the end of the table"""
+        packed = self.__pack(record)
+        if packed is None:
+            self.__others[len(self)] = record
+            for column in self.__columns.values():
+                column.append_empty()
+        else:
+            for column, value in zip(self.__columns.values(), packed):
+                column.append(value)
+        self.__rows += 1
+
+    def __pack(self, record):
+        """Returns the values of the columns for record, None if it does not fit in them"""
+        if list(record.keys()) != PATIENT_FIELDS:
+            return None
+        # Solo se empaqueta lo que se vuelve a escribir igual al desempaquetar
+        # Las claves ya estan en el orden de PATIENT_FIELDS, que es el de las columnas
+        packed = [column.pack(value) for column, value in zip(self.__columns.values(), record.values())]
+        return None if None in packed else packed
+
+    def record(self, row):
+        """Returns the record of row as a dict with the keys of the registry"""
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("PatientTable row out of range")
+        if row in self.__others:
+            return self.__others[row]
+        return {field: column.get(row) for field, column in self.__columns.items()}
+
+    def column(self, name):
+        """Returns the list of values of one field of the registry, one per row"""
+        if name not in PATIENT_FIELDS:
+            raise KeyError(name)
+        if name in ["age", "time_stamp"] and not self.__others:
+            return self.__columns[name].tolist()
+        column = self.__columns[name]
+        return [self.__others[row].get(name) if row in self.__others else column.get(row)
+                for row in range(len(self))]
+
+    def find(self, patient_system_id):
+        """Returns the last record registered with patient_system_id, None if there is none"""
+        row = self.__columns["patient_system_id"].last_row(patient_system_id, self.__others)
+        for other, record in self.__others.items():
+            if other > row and record.get("patient_system_id") == patient_system_id:
+                row = other
+        return self.record(row) if row != -1 else None
@@ -0,0 +1,179 @@
+"""Contains the class OperationProfiler, the profiling mode of the operations of VaccineManager"""
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+PROFILE_VARIABLE = "UC3M_CARE_PROFILE"
+
+# Perfiladores activos, el ultimo es el que mide las operaciones
+_active = []
+
+
+def active_profiler():
+    """Returns the OperationProfiler that is profiling the operations, None if there is none"""
+    return _active[-1] if _active else None
+
+
+class OperationProfiler:
+    """Class that profiles every operation of VaccineManager during a session
+
+    While it is active (between start() and stop(), or inside a with block)
+    every public operation of any VaccineManager runs under cProfile and
+    tracemalloc. The CPU profiles of the calls to the same operation are added
+    up, and so are their calls and time, and the biggest allocation peak of a
+    call is kept. stop() writes a report with the hotspots of every operation.
+
+    cProfile and the peak of tracemalloc are global to the process, so when
+    two threads run operations at the same time only one of them is
+    profiled; the other one is only counted and timed.
+
+    Setting the environment variable UC3M_CARE_PROFILE profiles the whole
+    process: its value is the file where the report is written at exit, or
+    "-" for the standard error.
+    """
+
+    def __init__(self, output=None, top=15, sort="tottime", memory=True):
+        """
+        :param output: path of the file or text stream where stop() writes the
+        report, the standard error by default
+        :param top: number of functions of each operation in the report
+        :param sort: pstats order of the functions ("tottime", "cumulative"...)
+        :param memory: if False the allocations are not traced
+        """
+        self.__output = output
+        # Orden y numero de funciones de cada operacion en el informe
+        self.__report_order = (sort, top)
+        self.__memory = memory
+        self.__lock = threading.Lock()
+        self.__profiled = threading.Lock()
+        # operacion -> [llamadas, llamadas perfiladas, segundos, pico de memoria, cProfile.Profile]
+        self.__operations = {}
+        self.__started_tracemalloc = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def start(self):
+        """Starts profiling the operations of every VaccineManager"""
+        if self.__memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.__started_tracemalloc = True
+        _active.append(self)
+
+    def stop(self):
+        """Stops profiling and writes the report to output"""
+        if self in _active:
+            _active.remove(self)
+        if self.__started_tracemalloc:
+            tracemalloc.stop()
+            self.__started_tracemalloc = False
+        self.dump()
+
+    @contextmanager
+    def operation(self, name):
+        """Profiles the block as one call to the operation name"""
+        with self.__lock:
+            totals = self.__operations.setdefault(name, [0, 0, 0.0, 0, cProfile.Profile()])
+            totals[0] += 1
+        # Si otro hilo ya esta perfilando, esta llamada solo se cuenta
+        profiled = self.__profiled.acquire(blocking=False)
+        profile = totals[4] if profiled else None
+        start_memory = 0
+        try:
+            if profiled:
+                if tracemalloc.is_tracing():
+                    tracemalloc.reset_peak()
+                    start_memory = tracemalloc.get_traced_memory()[0]
+                try:
+                    profile.enable()
+                except ValueError:
+                    # Ya hay otro perfilador del interprete activo (python -m cProfile...)
+                    profile = None
+            start = time.perf_counter()
+            try:
+                yield
+            finally:
+                seconds = time.perf_counter() - start
+                if profile is not None:
+                    profile.disable()
+                peak = tracemalloc.get_traced_memory()[1] - start_memory if profiled and tracemalloc.is_tracing() \
+                    else 0
+                with self.__lock:
+                    totals[1] += 1 if profiled else 0
+                    totals[2] += seconds
+                    totals[3] = max(totals[3], peak)
+        finally:
+            if profiled:
+                self.__profiled.release()
+
+    def operations(self):
+        """Returns a dict operation -> {"calls", "profiled_calls", "seconds", "allocation_peak"}"""
+        with self.__lock:
+            return {name: {"calls": calls, "profiled_calls": profiled, "seconds": seconds,
+                           "allocation_peak": peak}
+                    for name, (calls, profiled, seconds, peak, _) in self.__operations.items()}
+
+    def stats(self, name):
+        """Returns the pstats.Stats of the operation name, None if it has not been profiled"""
+        with self.__lock:
+            totals = self.__operations.get(name)
+        if totals is None or totals[1] == 0:
+            return None
+        # Crear las estadisticas para el perfilador, se espera a que nadie lo este usando
+        with self.__profiled:
+            try:
+                return pstats.Stats(totals[4], stream=io.StringIO())
+            except TypeError:
+                # Un Profile sin ninguna funcion medida no tiene estadisticas
+                return None
+
+    def report(self):
+        """Returns the text of the report, one section per operation ordered by time"""
+        operations = self.operations()
+        lines = [f"uc3m_care profile: {len(operations)} operations"]
+        for name, values in sorted(operations.items(), key=lambda item: -item[1]["seconds"]):
+            lines.append("")
+            lines.append(f"{name}: {values['calls']} calls ({values['profiled_calls']} profiled), "
+                         f"{values['seconds']:.3f} s, {values['seconds'] / values['calls'] * 1000:.3f} ms per call, "
+                         f"allocation peak {values['allocation_peak'] / 1024:.1f} KiB")
+            stats = self.stats(name)
+            if stats is not None:
+                stats.stream = io.StringIO()
+                sort, top = self.__report_order
+                stats.sort_stats(sort).print_stats(top)
+                lines.append(stats.stream.getvalue().strip("\n"))
+        return "\n".join(lines) + "\n"
+
+    def dump(self):
+        """Writes the report to output"""
+        if isinstance(self.__output, str):
+            with open(self.__output, "w", encoding="utf-8") as file:
+                file.write(self.report())
+        else:
+            (self.__output if self.__output is not None else sys.stderr).write(self.report())
+
+
+def profile_from_environment():
+    """Starts an OperationProfiler for the whole process if UC3M_CARE_PROFILE is
+    set, its report is written at exit. Returns it, or None"""
+    output = os.environ.get(PROFILE_VARIABLE)
+    if not output:
+        return None
+    profiler = OperationProfiler(None if output == "-" else output)
+    profiler.start()
+    atexit.register(profiler.stop)
+    return profiler
+
+
+SESSION_PROFILER = profile_from_environment()
@@ -0,0 +1,117 @@
+"""Contains the class ReadCache"""
+import os
+import threading
+from collections import OrderedDict
+
+
+def copy_record(value):
+    """Returns a copy of a record (or any value) read from JSON or msgpack that
+    shares no dict or list with it"""
+    if isinstance(value, dict):
+        return {key: copy_record(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_record(item) for item in value]
+    # El resto de valores (textos, numeros, None...) no se pueden modificar
+    return value
+
+
+def copy_records(records):
+    """Returns a new list with a copy of every record"""
+    return [copy_record(record) for record in records]
+
+
+class ReadCache:
+    """Class representing a cache of the records read from the store files
+
+    The records of a file are kept together with the state of the file when it
+    was read (inode, size and mtime, see JsonStore.state), and are only
+    returned while the file still has that state, so a file changed by another
+    process or replaced by a write is parsed again. The stores put in the
+    cache what they write themselves, so reading a file just written does not
+    parse it either.
+
+    The least recently used files are dropped when the size of the files
+    cached goes over max_bytes; a bigger file is never cached. The cache
+    keeps its own copy of the records and by default returns a new copy on
+    every read, so the records given to a caller can be modified without
+    changing the cache or what the next write saves.
+    """
+
+    def __init__(self, max_bytes=64 << 20):
+        """
+        :param max_bytes: maximum number of bytes of the files whose records are cached
+        """
+        self.__max_bytes = max_bytes
+        self.__lock = threading.Lock()
+        # ruta -> (estado, registros)
+        self.__entries = OrderedDict()
+        self.__bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+
+    @property
+    def hits(self):
+        """Property that represents the number of reads answered by the cache"""
+        return self.__hits
+
+    @property
+    def misses(self):
+        """Property that represents the number of reads that had to parse the file"""
+        return self.__misses
+
+    @property
+    def nbytes(self):
+        """Property that represents the size of the files cached"""
+        return self.__bytes
+
+    def get(self, path, state, copy=True):
+        """Returns the records of path if they were cached with state, None otherwise.
+        With copy=False the cached list itself is returned, it must not be modified"""
+        path = os.path.abspath(path)
+        with self.__lock:
+            entry = self.__entries.get(path)
+            if entry is None or state is None or entry[0] != state:
+                self.__misses += 1
+                return None
+            self.__entries.move_to_end(path)
+            self.__hits += 1
+            records = entry[1]
+        return copy_records(records) if copy else records
+
+    def put(self, path, state, records, copy=True):
+        """Caches the records read from or written to path when it had state.
+        With copy=False the cache keeps the list itself, nobody else may modify it"""
+        path = os.path.abspath(path)
+        cacheable = state is not None and state[1] <= self.__max_bytes
+        if cacheable and copy:
+            # La copia se hace fuera del bloqueo, los registros del llamador pueden cambiar despues
+            records = copy_records(records)
+        with self.__lock:
+            self.__remove(path)
+            if not cacheable:
+                return
+            self.__entries[path] = (state, records)
+            self.__bytes += state[1]
+            while self.__bytes > self.__max_bytes:
+                self.__remove(next(iter(self.__entries)))
+
+    def discard(self, path):
+        """Drops the records of path"""
+        with self.__lock:
+            self.__remove(os.path.abspath(path))
+
+    def clear(self):
+        """Drops every file"""
+        with self.__lock:
+            self.__entries.clear()
+            self.__bytes = 0
+
+    def __remove(self, path):
+        """Drops the records of path, holding the lock"""
+        entry = self.__entries.pop(path, None)
+        if entry is not None:
+            self.__bytes -= entry[0][1]
+
+
+# Cache que comparten por defecto todos los JsonStore del proceso
+READ_CACHE = ReadCache()
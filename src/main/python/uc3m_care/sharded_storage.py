@@ -0,0 +1,118 @@
+"""Contains the class ShardedStorage"""
+import heapq
+import itertools
+import json
+import os
+import zlib
+
+from uc3m_care.storage_backend import StorageBackend
+from uc3m_care.json_storage import JsonStorage
+
+STORE_FILES = ["patient_registry.json", "vaccination_appointments.json", "registered_vaccinations.json"]
+
+
+class ShardedStorage(StorageBackend):
+    """Storage that splits the records among several storages (shards)
+
+    Patients go to the shard of their patient_system_id, and appointments and
+    registered vaccinations to the one of their date_signature, so a lookup
+    only reads one shard and every shard can be written by a different
+    process. The shard of a key is given by its first prefix_length hex
+    digits modulo the number of shards (see shard_of). Only
+    find_patient_by_id, whose patient_id does not give the shard, asks all
+    of them.
+    """
+
+    def __init__(self, shards, prefix_length=4):
+        """
+        :param shards: list of StorageBackend, one per shard
+        :param prefix_length: number of characters of the key used to choose the shard
+        """
+        if not shards:
+            raise ValueError("ShardedStorage needs at least one shard")
+        self.__shards = list(shards)
+        self.__prefix_length = prefix_length
+
+    @classmethod
+    def json_shards(cls, folder, shards, prefix_length=4, storage_class=JsonStorage, **json_storage_options):
+        """
+        Creates a ShardedStorage of JsonStorage, one per directory folder/shard_<n>,
+        creating the directories and empty stores that do not exist
+        :param storage_class: JsonStorage or a subclass, like StreamingJsonStorage
+        :param json_storage_options: other arguments of JsonStorage (registry_format...)
+        """
+        storages = []
+        for shard in range(shards):
+            shard_folder = os.path.join(folder, f"shard_{shard:03d}")
+            os.makedirs(shard_folder, exist_ok=True)
+            paths = [os.path.join(shard_folder, name) for name in STORE_FILES]
+            for path in paths:
+                if not os.path.exists(path):
+                    with open(path, "w", encoding="utf-8") as file:
+                        json.dump([], file)
+            storages.append(storage_class(*paths, **json_storage_options))
+        return cls(storages, prefix_length)
+
+    @property
+    def shards(self):
+        """Property that represents the list of storages of the shards"""
+        return self.__shards
+
+    def shard_of(self, key):
+        """Returns the number of the shard of a patient_system_id or a date_signature"""
+        prefix = key[:self.__prefix_length]
+        try:
+            value = int(prefix, 16)
+        except ValueError:
+            # Las claves que no son hexadecimales se reparten por el crc32 del prefijo
+            value = zlib.crc32(prefix.encode("utf-8"))
+        return value % len(self.__shards)
+
+    def __split(self, records, key):
+        """Returns a dict shard -> list of the records that go to that shard,
+        with key None the records are the keys themselves"""
+        parts = {}
+        for record in records:
+            parts.setdefault(self.shard_of(record[key] if key is not None else record), []).append(record)
+        return parts
+
+    def add_patients(self, records):
+        for shard, part in self.__split(records, "patient_system_id").items():
+            self.__shards[shard].add_patients(part)
+
+    def find_patient(self, patient_system_id):
+        return self.__shards[self.shard_of(patient_system_id)].find_patient(patient_system_id)
+
+    def find_patient_by_id(self, patient_id):
+        # El patient_id no dice en que shard esta, se pregunta a todos y gana el registro mas reciente
+        patients = [shard.find_patient_by_id(patient_id) for shard in self.__shards]
+        patients = [patient for patient in patients if patient is not None]
+        if not patients:
+            return None
+        return max(patients, key=lambda patient: patient["time_stamp"])
+
+    def iter_patients(self):
+        """Yields the patient registry records shard by shard"""
+        return itertools.chain.from_iterable(shard.iter_patients() for shard in self.__shards)
+
+    def add_appointments(self, records):
+        for shard, part in self.__split(records, "date_signature").items():
+            self.__shards[shard].add_appointments(part)
+
+    def find_appointment(self, date_signature):
+        return self.__shards[self.shard_of(date_signature)].find_appointment(date_signature)
+
+    def find_appointments(self, date_signatures):
+        appointments = {}
+        for shard, part in self.__split(date_signatures, None).items():
+            appointments.update(self.__shards[shard].find_appointments(part))
+        return appointments
+
+    def appointments_between(self, start, end):
+        # Cada shard las devuelve ordenadas, se mezclan sin cargarlas todas
+        return heapq.merge(*(shard.appointments_between(start, end) for shard in self.__shards),
+                           key=lambda appointment: appointment["vaccine_date"])
+
+    def add_administrations(self, records):
+        for shard, part in self.__split(records, "Key_value").items():
+            self.__shards[shard].add_administrations(part)
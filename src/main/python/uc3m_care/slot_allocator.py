@@ -0,0 +1,165 @@
+"""Contains the class SlotAllocator"""
+import json
+import os
+from contextlib import contextmanager
+from datetime import date
+
+from uc3m_care.json_store import JsonStore, JSON_LINES_FORMAT
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+
+
+class SlotAllocator:
+    """Class that assigns to every appointment the earliest day with free capacity
+
+    Every vaccination center has a number of slots per day. A booking asked
+    for a day gets that day or, if it is full, the next one with a free slot,
+    in the given center or in the one that has the earliest free day.
+
+    The full days of each center are kept as a disjoint-set forest: a full day
+    points to the next day, and the root of a day is the earliest free day
+    from it on. With path compression a booking costs amortized almost O(1)
+    per center however many days are full, instead of walking them.
+
+    The slots booked are persisted in a JSON Lines file, one line per center
+    and day of every commit ({"center", "vaccine_date", "slots"}), that is
+    appended holding the lock of the file. booking() reads the lines written
+    by other processes before booking, so several processes can share it.
+    Without a path the state is only kept in memory.
+    """
+
+    def __init__(self, capacities, path=None):
+        """
+        :param capacities: dict center -> slots per day, or an int for a single
+        center called "default"
+        :param path: JSON Lines file where the slots booked are saved, None to
+        keep them only in memory
+        """
+        if isinstance(capacities, int):
+            capacities = {"default": capacities}
+        if not capacities or any(type(slots) != int or slots < 1 for slots in capacities.values()):
+            raise ValueError("Every center needs a capacity of at least one slot per day")
+        self.__capacities = dict(capacities)
+        self.__store = JsonStore(path, JSON_LINES_FORMAT) if path is not None else None
+        self.__booked = {center: {} for center in self.__capacities}
+        # Dias llenos de cada centro -> dia siguiente por el que seguir buscando
+        self.__full_days = {center: {} for center in self.__capacities}
+        # Inodo del fichero leido y hasta donde se ha leido
+        self.__inode = None
+        self.__offset = 0
+
+    @property
+    def capacities(self):
+        """Property that represents the dict center -> slots per day"""
+        return dict(self.__capacities)
+
+    def __reset(self):
+        """Forgets the slots booked, they are read again from the file"""
+        self.__booked = {center: {} for center in self.__capacities}
+        self.__full_days = {center: {} for center in self.__capacities}
+        self.__inode = None
+        self.__offset = 0
+
+    def booked(self, center, day):
+        """Returns the number of slots booked in center on day (date)"""
+        self.__refresh()
+        return self.__booked[center].get(day.toordinal(), 0)
+
+    @contextmanager
+    def booking(self):
+        """Holds the allocator while booking and yields the function
+        book(earliest, center=None) -> (date, center). The slots are saved when
+        the block ends; if it raises an exception they are not saved and are
+        released again"""
+        pending = {}
+
+        def book(earliest, center=None):
+            """Books a slot on the first day from earliest (date) with a free slot"""
+            day, chosen = self.__book(earliest.toordinal(), center)
+            pending[(chosen, day)] = pending.get((chosen, day), 0) + 1
+            return date.fromordinal(day), chosen
+
+        with self.__lock():
+            self.__refresh()
+            try:
+                yield book
+                if pending:
+                    self.__save(pending)
+            except BaseException:
+                # Los huecos reservados en memoria se descartan
+                self.__reset()
+                raise
+
+    def __book(self, day, center):
+        """Books a slot and returns (day, center)
+        :raises: VaccineManagementException if the center does not exist"""
+        if center is None:
+            # Gana el centro con el primer dia libre, en caso de empate el primero
+            candidates = [(self.__free_day(name, day), name) for name in self.__capacities]
+            day, center = min(candidates, key=lambda candidate: candidate[0])
+        elif center in self.__capacities:
+            day = self.__free_day(center, day)
+        else:
+            raise VaccineManagementException("Invalid vaccination center")
+        self.__add(center, day, 1)
+        return day, center
+
+    def __free_day(self, center, day):
+        """Returns the first day from day with a free slot in center"""
+        full_days = self.__full_days[center]
+        root = day
+        while root in full_days:
+            root = full_days[root]
+        # Compresion de caminos: los dias recorridos apuntan directamente al libre
+        while day in full_days and full_days[day] != root:
+            full_days[day], day = root, full_days[day]
+        return root
+
+    def __add(self, center, day, slots):
+        """Adds slots booked to center on day, marking it as full if there are no more"""
+        booked = self.__booked[center]
+        booked[day] = booked.get(day, 0) + slots
+        if booked[day] >= self.__capacities[center]:
+            self.__full_days[center][day] = day + 1
+
+    @contextmanager
+    def __lock(self):
+        """Holds the lock of the file, if there is one"""
+        if self.__store is None:
+            yield
+            return
+        with self.__store.lock():
+            yield
+
+    def __refresh(self):
+        """Adds the slots saved in the file since the last read"""
+        if self.__store is None:
+            return
+        state = self.__store.state()
+        if state is None or state[0] != self.__inode or state[1] < self.__offset:
+            # El fichero se ha borrado, vaciado o sustituido, se vuelve a leer entero
+            self.__reset()
+        if state is None:
+            return
+        self.__inode = state[0]
+        records, self.__offset = self.__store.load_from(self.__offset)
+        for record in records:
+            # Los centros que ya no estan configurados se ignoran
+            if record["center"] in self.__capacities:
+                self.__add(record["center"], date.fromisoformat(record["vaccine_date"]).toordinal(),
+                           record["slots"])
+
+    def __save(self, pending):
+        """Appends the slots booked to the file, holding its lock"""
+        if self.__store is None:
+            return
+        content = "".join(json.dumps({"center": center, "vaccine_date": date.fromordinal(day).isoformat(),
+                                      "slots": slots}) + "\n"
+                          for (center, day), slots in pending.items())
+        with open(self.__store.path, "ab") as file:
+            # Se quita la linea a medias que pudiera dejar un proceso que fallo al escribir
+            file.truncate(self.__offset)
+            file.write(content.encode("utf-8"))
+            file.flush()
+            os.fsync(file.fileno())
+        # Lo que se acaba de escribir ya esta en memoria
+        self.__inode, self.__offset = self.__store.state()[:2]
@@ -0,0 +1,87 @@
+"""Contains the class SqliteStorage"""
+import sqlite3
+
+from uc3m_care.storage_backend import StorageBackend, patient_id_key
+
+PATIENT_FIELDS = ["patient_id", "name_surname", "registration_type", "phone_number",
+                  "age", "time_stamp", "patient_system_id"]
+APPOINTMENT_FIELDS = ["patient_id", "phone_number", "vaccine_date", "patient_system_id", "date_signature"]
+ADMINISTRATION_FIELDS = ["Access_date", "Key_value"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS patients (
+    patient_id TEXT, name_surname TEXT, registration_type TEXT, phone_number TEXT,
+    age INTEGER, time_stamp REAL, patient_system_id TEXT);
+CREATE INDEX IF NOT EXISTS patients_patient_system_id ON patients (patient_system_id);
+CREATE INDEX IF NOT EXISTS patients_patient_id_key ON patients (lower(patient_id));
+CREATE TABLE IF NOT EXISTS appointments (
+    patient_id TEXT, phone_number TEXT, vaccine_date TEXT, patient_system_id TEXT, date_signature TEXT);
+CREATE INDEX IF NOT EXISTS appointments_date_signature ON appointments (date_signature);
+CREATE INDEX IF NOT EXISTS appointments_patient_id ON appointments (patient_id);
+CREATE INDEX IF NOT EXISTS appointments_vaccine_date ON appointments (vaccine_date);
+CREATE TABLE IF NOT EXISTS administrations (Access_date TEXT, Key_value TEXT);
+CREATE INDEX IF NOT EXISTS administrations_key_value ON administrations (Key_value);
+"""
+
+
+class SqliteStorage(StorageBackend):
+    """Storage that keeps the records in the tables of a SQLite database
+
+    Lookups use the indexes of the tables and every add_* call is a single transaction."""
+
+    def __init__(self, database):
+        """
+        :param database: path of the database file (":memory:" for a temporary one)
+        """
+        self.__connection = sqlite3.connect(database, check_same_thread=False)
+        with self.__connection:
+            self.__connection.executescript(SCHEMA)
+
+    def close(self):
+        """Closes the connection with the database"""
+        self.__connection.close()
+
+    def __insert(self, table, fields, records):
+        """Inserts the records in table in a single transaction"""
+        query = "INSERT INTO " + table + " (" + ", ".join(fields) + ") VALUES (" + ", ".join("?" * len(fields)) + ")"
+        with self.__connection:
+            self.__connection.executemany(query, [[record[field] for field in fields] for record in records])
+
+    def __find(self, table, fields, key, value):
+        """Returns as a dict the last row of table whose key (a column or an
+        indexed expression) is value, None if there is none"""
+        query = "SELECT " + ", ".join(fields) + " FROM " + table + " WHERE " + key + " = ? ORDER BY rowid DESC LIMIT 1"
+        row = self.__connection.execute(query, (value,)).fetchone()
+        if row is None:
+            return None
+        return dict(zip(fields, row))
+
+    def add_patients(self, records):
+        self.__insert("patients", PATIENT_FIELDS, records)
+
+    def find_patient(self, patient_system_id):
+        return self.__find("patients", PATIENT_FIELDS, "patient_system_id", patient_system_id)
+
+    def find_patient_by_id(self, patient_id):
+        # Se busca con la misma expresion que el indice para que sqlite lo use
+        return self.__find("patients", PATIENT_FIELDS, "lower(patient_id)", patient_id_key(patient_id))
+
+    def iter_patients(self):
+        query = "SELECT " + ", ".join(PATIENT_FIELDS) + " FROM patients ORDER BY rowid"
+        for row in self.__connection.execute(query):
+            yield dict(zip(PATIENT_FIELDS, row))
+
+    def add_appointments(self, records):
+        self.__insert("appointments", APPOINTMENT_FIELDS, records)
+
+    def find_appointment(self, date_signature):
+        return self.__find("appointments", APPOINTMENT_FIELDS, "date_signature", date_signature)
+
+    def appointments_between(self, start, end):
+        query = "SELECT " + ", ".join(APPOINTMENT_FIELDS) + " FROM appointments" \
+            " WHERE vaccine_date BETWEEN ? AND ? ORDER BY vaccine_date, rowid"
+        cursor = self.__connection.execute(query, (start, end))
+        return (dict(zip(APPOINTMENT_FIELDS, row)) for row in cursor)
+
+    def add_administrations(self, records):
+        self.__insert("administrations", ADMINISTRATION_FIELDS, records)
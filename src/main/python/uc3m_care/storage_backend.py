@@ -0,0 +1,60 @@
+"""Contains the class StorageBackend"""
+
+
+def patient_id_key(patient_id):
+    """Returns the key of a patient_id in the indexes of the storages: the UUID
+    in lower case, so the same UUID written in any case is the same patient"""
+    return patient_id.lower() if isinstance(patient_id, str) else patient_id
+
+
+class StorageBackend:
+    """Base class of the storages where VaccineManager saves the patients,
+    the vaccination appointments and the registered vaccinations
+
+    Records are dicts with the same keys that are written in the JSON files."""
+
+    def add_patients(self, records):
+        """Saves a list of patient registry records"""
+        raise NotImplementedError
+
+    def find_patient(self, patient_system_id):
+        """Returns the last patient registered with patient_system_id, None if there is none"""
+        raise NotImplementedError
+
+    def find_patient_by_id(self, patient_id):
+        """Returns the last patient registered with the UUID patient_id, in any
+        letter case, None if there is none"""
+        raise NotImplementedError
+
+    def iter_patients(self):
+        """Yields the patient registry records in the order they were saved"""
+        raise NotImplementedError
+
+    def add_appointments(self, records):
+        """Saves a list of vaccination appointments"""
+        raise NotImplementedError
+
+    def find_appointment(self, date_signature):
+        """Returns the appointment with date_signature, None if there is none"""
+        raise NotImplementedError
+
+    def find_appointments(self, date_signatures):
+        """Returns a dict date_signature -> appointment with the appointments of
+        a list of signatures; the ones that are not found are left out"""
+        appointments = {}
+        for date_signature in set(date_signatures):
+            appointment = self.find_appointment(date_signature)
+            if appointment is not None:
+                appointments[date_signature] = appointment
+        return appointments
+
+    def appointments_between(self, start, end):
+        """Returns an iterator of the appointments whose vaccine_date ("YYYY-MM-DD")
+        is between start and end, both included, ordered by vaccine_date. The
+        query runs in the call (index loads, reads of the store); only the
+        appointments already selected are yielded while it is consumed"""
+        raise NotImplementedError
+
+    def add_administrations(self, records):
+        """Saves a list of registered vaccinations"""
+        raise NotImplementedError
@@ -5,6 +5,10 @@ import hashlib
 class VaccinationAppoinment():
     """Class representing an appoinment  for the vaccination of a patient"""
 
+    # Sin __dict__ por instancia, en las cargas masivas hay millones de citas
+    __slots__ = ("__alg", "__type", "__patient_id", "__patient_sys_id", "__phone_number",
+                 "__appoinment_date_format", "__issued_at", "__appoinment_date", "__signature")
+
     def __init__( self, guid, patient_sys_id, patient_phone_number, days ):
         self.__alg = "SHA-256"
         self.__type = "DS"
@@ -21,6 +25,7 @@ class VaccinationAppoinment():
             #age must be expressed in senconds to be added to the timestap
             self.__appoinment_date = str(self.__issued_at + (days * 24 * 60 * 60))
         self.__issued_at=str(self.__issued_at)
+        self.__signature = None
 
     def __signature_string(self):
         """Composes the string to be used for generating the key for the date"""
@@ -42,6 +47,7 @@ class VaccinationAppoinment():
     @patient_sys_id.setter
     def patient_sys_id(self, value):
         self.__patient_sys_id = value
+        self.__signature = None
 
     @property
     def phone_number( self ):
@@ -54,8 +60,10 @@ class VaccinationAppoinment():
 
     @property
     def vaccination_signature( self ):
-        """Returns the sha256 signature of the date"""
-        return hashlib.sha256(self.__signature_string().encode()).hexdigest()
+        """Returns the sha256 signature of the date, computed the first time it is read"""
+        if self.__signature is None:
+            self.__signature = hashlib.sha256(self.__signature_string().encode()).hexdigest()
+        return self.__signature
 
     @property
     def issued_at(self):
@@ -65,6 +73,7 @@ class VaccinationAppoinment():
     @issued_at.setter
     def issued_at( self, value ):
         self.__issued_at = datetime.fromtimestamp(int(float(value)))
+        self.__signature = None
 
     @property
     def appoinment_date( self ):
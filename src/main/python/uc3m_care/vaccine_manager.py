@@ -1,13 +1,26 @@
 """Vaccine manager"""
+import glob
 import json
 import re
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 
-from datetime import datetime
+from datetime import datetime, timedelta, date as date_type
 from uc3m_care.vaccine_management_exception import VaccineManagementException
 from uc3m_care.vaccine_patient_register import VaccinePatientRegister
 from uc3m_care.vaccination_appoinment import VaccinationAppoinment
+from uc3m_care.json_store import JSON_FORMAT
+from uc3m_care.json_storage import JsonStorage, StreamingJsonStorage
+from uc3m_care.storage_backend import patient_id_key
+from uc3m_care.sharded_storage import ShardedStorage
+from uc3m_care.patient_table import PatientTable
+from uc3m_care.instrumentation import NO_INSTRUMENTATION, phase
+from uc3m_care.profiling import active_profiler
+
+ALLOW_DUPLICATES = "allow"
+RETURN_EXISTING = "return"
+REJECT_DUPLICATES = "raise"
 
 class VaccineManager:
     """Class for providing the methods for managing the vaccination process"""
@@ -19,12 +32,81 @@ class VaccineManager:
     vaccination_appointments = json_store + "/vaccination_appointments.json"
     vaccination_administration = json_store + "/vaccine_administration.json"
     registered_vaccinations = json_store + "/registered_vaccinations.json"
+    vaccination_slots = json_store + "/vaccination_slots.jsonl"
+    sharded_store = json_store + "/shards"
 
-    def __init__(self) -> None:
+    def __init__(self, storage=None, duplicate_patients: str = ALLOW_DUPLICATES,
+                 instrumentation=None, slot_allocator=None) -> None:
+        """
+        :param storage: StorageBackend where the records are saved, by default
+        json_storage(): a JsonStorage with the files of json_store
+        :param duplicate_patients: what request_vaccination_id does with a patient_id
+        that is already registered: "allow" registers it again (default), "return"
+        returns the patient_system_id of the existing registration and "raise"
+        raises VaccineManagementException. The check uses an index on patient_id
+        that ignores the letter case of the UUID. It is only a guarantee within one
+        process: the lookup and the write are not under the same lock of the store,
+        so two processes writing to the same files can both register a new patient_id
+        :param instrumentation: Instrumentation that measures the phases of every
+        operation (validation, hashing, storage reads and writes...), nothing is
+        measured by default. The operations are also profiled while an
+        OperationProfiler is active (see uc3m_care.profiling)
+        :param slot_allocator: SlotAllocator with the capacity of the vaccination
+        centers. With it an appointment gets the first day from the tenth on with
+        a free slot; without it, always the tenth day (default). Its file is
+        usually vaccination_slots, next to the appointments
+        """
+        if duplicate_patients not in [ALLOW_DUPLICATES, RETURN_EXISTING, REJECT_DUPLICATES]:
+            raise ValueError("Invalid duplicate_patients: " + str(duplicate_patients))
+        self.__duplicate_patients = duplicate_patients
+        self.__storage = storage if storage is not None else self.json_storage()
+        self.__instrumentation = instrumentation if instrumentation is not None else NO_INSTRUMENTATION
+        self.__slot_allocator = slot_allocator
         self.__uuid4_rule = re.compile(r'^[0-9A-F]{8}-[0-9A-F]{4}-4[0-9A-F]{3}-[89AB]'
                                        r'[0-9A-F]{3}-[0-9A-F]{12}$',
                                        re.IGNORECASE)
 
+    @classmethod
+    def json_storage(cls, registry_format: str = JSON_FORMAT, store_format: str = JSON_FORMAT,
+                     write_ahead_log: bool = False, shards: int = 1, index_appointments: bool = True):
+        """
+        Returns the storage in the files of json_store, the default one of VaccineManager
+        :param registry_format: layout of the patient registry, "json" (default),
+        "compact" (minified JSON), "jsonl" (append-only JSON Lines, one registration
+        per line) or "msgpack" (append-only msgpack records). Every layout uses the
+        same patient_registry file: a registry written in another layout is still
+        read, and it is converted to this one on the next registration
+        :param store_format: layout of the appointments and administrations files,
+        with the same values as registry_format. Files written in another layout
+        are still read and are converted on the next write
+        :param write_ahead_log: if True new records are appended to a log next to
+        each file (<file>.wal) that is folded into the file when it grows, so
+        writes do not rewrite the whole file
+        :param shards: if it is more than 1, a ShardedStorage with that number of
+        JsonStorage in the directories of sharded_store
+        :param index_appointments: if False, a StreamingJsonStorage that looks up
+        the appointments reading the file as a stream instead of indexing them
+        :return: JsonStorage, or ShardedStorage if there is more than one shard
+        """
+        storage_class = JsonStorage if index_appointments else StreamingJsonStorage
+        if shards > 1:
+            return ShardedStorage.json_shards(cls.sharded_store, shards, storage_class=storage_class,
+                                              registry_format=registry_format, store_format=store_format,
+                                              write_ahead_log=write_ahead_log)
+        return storage_class(cls.patient_registry, cls.vaccination_appointments, cls.registered_vaccinations,
+                             registry_format, store_format, write_ahead_log)
+
+    @contextmanager
+    def __operation(self, name):
+        """Measures the block as one call to the public operation name"""
+        profiler = active_profiler()
+        if profiler is None:
+            with self.__instrumentation.operation(name):
+                yield
+            return
+        with profiler.operation(name), self.__instrumentation.operation(name):
+            yield
+
     #RF1
 
     def validate_uuid4(self, guid: str) -> bool:
@@ -43,17 +125,13 @@ class VaccineManager:
             raise VaccineManagementException("Invalid UUID format") from error
         return True
 
-    def request_vaccination_id(self, patient_id: str, registration_type: str,
-                               name_surname: str, phone_number: str,
-                               age: int) -> str:
+    def validate_patient(self, patient_id: str, registration_type: str,
+                         name_surname: str, phone_number: str,
+                         age: int) -> bool:
         """
-        Requests the vaccination ID
-        :param patient_id:
-        :param registration_type:
-        :param name_surname:
-        :param phone_number:
-        :param age:
-        :return MD5 hash of the patient ID (str)
+        Validates the data of a patient that requests a vaccination ID
+        :return: True if the data is valid (bool)
+        :raises: VaccineManagementException: If any of the fields is not valid
         """
         if type(patient_id)!=str:
             raise VaccineManagementException("Invalid patient ID")
@@ -74,7 +152,7 @@ class VaccineManager:
         if len(split_name_surname) < 2:
             raise VaccineManagementException("Invalid name and surname")
 
-        if len(phone_number) != 9:
+        if type(phone_number)!=str or len(phone_number) != 9:
             raise VaccineManagementException("Invalid phone number")
 
         try:
@@ -84,24 +162,127 @@ class VaccineManager:
 
         try:
             int_age = int(age)
-        except ValueError as error:
+        except (TypeError, ValueError) as error:
             raise VaccineManagementException("Invalid age") from error
 
         if int_age < 6 or int_age > 125 or type(age)!=int:
             raise VaccineManagementException("Invalid age")
+        return True
 
-        vaccine_patient_register = VaccinePatientRegister(patient_id=patient_id, full_name=name_surname,
-                                                          phone_number=phone_number,
-                                                          age=age, registration_type=registration_type)
+    def request_vaccination_id(self, patient_id: str, registration_type: str,
+                               name_surname: str, phone_number: str,
+                               age: int) -> str:
+        """
+        Requests the vaccination ID
+        :param patient_id:
+        :param registration_type:
+        :param name_surname:
+        :param phone_number:
+        :param age:
+        :return MD5 hash of the patient ID (str)
+        """
+        with self.__operation("request_vaccination_id"):
+            with phase("validation"):
+                self.validate_patient(patient_id, registration_type, name_surname, phone_number, age)
+
+            registered = self.__registered_patient(patient_id)
+            if registered is not None:
+                return registered
+
+            with phase("hashing"):
+                vaccine_patient_register = VaccinePatientRegister(patient_id=patient_id, full_name=name_surname,
+                                                                  phone_number=phone_number,
+                                                                  age=age, registration_type=registration_type)
+                record = vaccine_patient_register.__dict__()
 
-        with open(self.patient_registry, "r+",
-                  encoding="utf-8") as file:
-            data = json.load(file)
-            data.append(vaccine_patient_register.__dict__())
-            file.seek(0)
-            json.dump(data, file, indent=2)
+            with phase("storage_write"):
+                self.__storage.add_patients([record])
 
-        return vaccine_patient_register.patient_system_id
+            return vaccine_patient_register.patient_system_id
+
+    def request_vaccination_ids(self, patients) -> list:
+        """
+        Requests the vaccination ID of several patients, saving all of them in a single write
+        :param patients: iterable of patients, each one a dict with the arguments of
+        request_vaccination_id or a tuple with them in the same order
+        :return: list with one dict per patient, in the same order, with the keys
+        "patient_system_id" (None if the patient is not valid) and "error"
+        (message of the VaccineManagementException, None if it is valid; "Invalid patient
+        record" if it does not have exactly those arguments)
+        """
+        with self.__operation("request_vaccination_ids"):
+            results = []
+            records = []
+            # Pacientes de este mismo lote, que todavia no estan en el almacen
+            batch = {}
+            for patient in patients:
+                try:
+                    vaccine_patient_register = self.__patient_register(patient)
+                    registered = self.__registered_patient(vaccine_patient_register.patient_id, batch)
+                except VaccineManagementException as error:
+                    results.append({"patient_system_id": None, "error": error.message})
+                    continue
+                if registered is not None:
+                    results.append({"patient_system_id": registered, "error": None})
+                    continue
+                batch[patient_id_key(vaccine_patient_register.patient_id)] = vaccine_patient_register.patient_system_id
+                records.append(vaccine_patient_register.__dict__())
+                results.append({"patient_system_id": vaccine_patient_register.patient_system_id, "error": None})
+
+            if records:
+                with phase("storage_write"):
+                    self.__storage.add_patients(records)
+            return results
+
+    def __patient_register(self, patient):
+        """Validates one patient of request_vaccination_ids and returns its VaccinePatientRegister
+        :raises: VaccineManagementException: If the patient is not valid or the record does not
+        have exactly the arguments of request_vaccination_id
+        """
+        # Un dict con claves de mas o de menos, o una tupla de otra longitud, es un error de ese paciente
+        try:
+            with phase("validation"):
+                if isinstance(patient, dict):
+                    self.validate_patient(**patient)
+                else:
+                    self.validate_patient(*patient)
+        except TypeError as error:
+            raise VaccineManagementException("Invalid patient record") from error
+        with phase("hashing"):
+            if isinstance(patient, dict):
+                return VaccinePatientRegister(patient["patient_id"], patient["name_surname"],
+                                              patient["registration_type"], patient["phone_number"], patient["age"])
+            return VaccinePatientRegister(patient[0], patient[2], patient[1], patient[3], patient[4])
+
+    def __registered_patient(self, patient_id, batch=None):
+        """Returns the patient_system_id of patient_id if it is already registered and
+        duplicate_patients is "return", None if it is not registered or duplicates are allowed.
+        Other processes can register the same patient_id between this lookup and the write
+        :raises: VaccineManagementException: If it is registered and duplicate_patients is "raise"
+        """
+        if self.__duplicate_patients == ALLOW_DUPLICATES:
+            return None
+        if batch is not None and patient_id_key(patient_id) in batch:
+            patient_system_id = batch[patient_id_key(patient_id)]
+        else:
+            with phase("duplicate_lookup"):
+                patient = self.__storage.find_patient_by_id(patient_id)
+            if patient is None:
+                return None
+            patient_system_id = patient["patient_system_id"]
+        if self.__duplicate_patients == REJECT_DUPLICATES:
+            raise VaccineManagementException("Patient already registered")
+        return patient_system_id
+
+    def load_patient_table(self) -> PatientTable:
+        """
+        Loads the patient registry in a PatientTable, a compact in-memory copy
+        for analytics and batch jobs. Later registrations are not added to it
+        :return: PatientTable with every registration, in order
+        """
+        with self.__operation("load_patient_table"):
+            with phase("storage_read"):
+                return PatientTable(self.__storage.iter_patients())
 
     #RF2
 
@@ -117,8 +298,96 @@ class VaccineManager:
 
         return path_file
 
-    def get_vaccine_date (self, input_file):
-        """Esta función recibe un json y devuelve 'signature'"""
+    def get_vaccine_date (self, input_file, center=None):
+        """Esta función recibe un json y devuelve 'signature'.
+        center es el centro de vacunacion del slot_allocator, por defecto el que
+        tenga antes un hueco libre"""
+        with self.__operation("get_vaccine_date"):
+            with phase("read_input"):
+                p_id, p_phone = self.__read_patient_file(input_file)
+            with self.__booking() as book:
+                date, date_dict = self.__create_appointment(p_id, p_phone, book, center)
+
+                with phase("storage_write"):
+                    self.__storage.add_appointments([date_dict])
+
+            return date.vaccination_signature
+
+    def get_vaccine_dates (self, input_files, center=None):
+        """
+        Generates the appointments of several patient files, saving all of them in a single write
+        :param input_files: directory with the json files, glob pattern (str) or iterable of paths
+        :param center: vaccination center of the slot_allocator, as in get_vaccine_date
+        :return: list with one dict per file with the keys "file", "date_signature"
+        (None if the appointment was not generated) and "error" (None if there is no error)
+        """
+        if type(input_files)==str:
+            if Path(input_files).is_dir():
+                input_files = sorted(str(path) for path in Path(input_files).glob("*.json"))
+            else:
+                input_files = sorted(glob.glob(input_files))
+
+        with self.__operation("get_vaccine_dates"), self.__booking() as book:
+            results = []
+            appointments = []
+            for input_file in input_files:
+                try:
+                    with phase("read_input"):
+                        p_id, p_phone = self.__read_patient_file(input_file)
+                    date, date_dict = self.__create_appointment(p_id, p_phone, book, center)
+                except VaccineManagementException as error:
+                    results.append({"file": input_file, "date_signature": None, "error": error.message})
+                    continue
+                except json.JSONDecodeError:
+                    results.append({"file": input_file, "date_signature": None,
+                                    "error": "Error while decoding JSON"})
+                    continue
+                appointments.append(date_dict)
+                results.append({"file": input_file, "date_signature": date.vaccination_signature, "error": None})
+
+            if appointments:
+                with phase("storage_write"):
+                    self.__storage.add_appointments(appointments)
+            return results
+
+    def appointments_between(self, start, end):
+        """
+        Returns the appointments of the days from start to end, both included,
+        without reading the appointments of other days
+        :param start: first day, a date or a "YYYY-MM-DD" string
+        :param end: last day, a date or a "YYYY-MM-DD" string
+        :return: iterator of the appointments ordered by vaccine_date
+        :raises: VaccineManagementException: If start or end are not valid dates,
+        or the appointments file cannot be read
+
+        The operation measures the validation and the query, which reads the
+        store and selects the days; the iterator only yields the appointments
+        already selected, so the code of the caller is not measured or profiled
+        as part of it
+        """
+        with self.__operation("appointments_between"):
+            with phase("validation"):
+                start, end = self.__iso_date(start), self.__iso_date(end)
+            with phase("storage_read"), self.__storage_errors():
+                return self.__storage.appointments_between(start, end)
+
+    @staticmethod
+    def __iso_date(value):
+        """Returns a date or a "YYYY-MM-DD" string as the vaccine_date of the appointments"""
+        if isinstance(value, datetime):
+            return value.date().isoformat()
+        if isinstance(value, date_type):
+            return value.isoformat()
+        if type(value)==str:
+            try:
+                return datetime.strptime(value, "%Y-%m-%d").date().isoformat()
+            except ValueError as error:
+                raise VaccineManagementException("Invalid date") from error
+        raise VaccineManagementException("Invalid date")
+
+    @staticmethod
+    def __read_patient_file(input_file):
+        """Reads and validates a file generated by generate_json, returns (PatientSystemID, ContactPhoneNumber)"""
         if type(input_file)!=str:
             raise VaccineManagementException("Invalid input type")
 
@@ -129,11 +398,15 @@ class VaccineManager:
         if not path_exist.is_file():
             raise VaccineManagementException("File does not exist")
 
-        with open(input_file, 'r', encoding="utf-8") as file:  # Leemos el fichero
-            data = json.load(file)
-            file.close()
+        try:
+            with open(input_file, 'r', encoding="utf-8") as file:  # Leemos el fichero
+                data = json.load(file)
+                file.close()
+        except UnicodeDecodeError as error:
+            # Un fichero que no es UTF-8 tampoco es un JSON valido
+            raise VaccineManagementException("Error while decoding JSON") from error
 
-        if list(data.keys())!=["PatientSystemID", "ContactPhoneNumber"]:
+        if not isinstance(data, dict) or list(data.keys())!=["PatientSystemID", "ContactPhoneNumber"]:
             raise VaccineManagementException("Invalid JSON structure")
 
         p_id=data["PatientSystemID"]
@@ -149,117 +422,144 @@ class VaccineManager:
             int(p_phone)
         except ValueError as error:
             raise VaccineManagementException("Invalid ContactPhoneNumber") from error
-
+        return p_id, p_phone
+
+    @contextmanager
+    def __booking(self):
+        """Holds the slot_allocator while the appointments are created and saved,
+        yields its book function, or None if there is no slot_allocator"""
+        if self.__slot_allocator is None:
+            yield None
+            return
+        with self.__slot_allocator.booking() as book:
+            yield book
+
+    def __create_appointment(self, p_id, p_phone, book=None, center=None):
+        """Looks for the patient in the registry and creates its appointment,
+        returns the VaccinationAppoinment and the dict to be saved"""
         ##Buscamos en las solicitudes:
-        with open(self.patient_registry, 'r', encoding="utf-8") as file: #Leemos el fichero
-            solicitudes = json.load(file)
-            file.close()
-
-        found=False
-        p_uuid=""
-
-        for dict in solicitudes:
-            if dict["patient_system_id"]==data["PatientSystemID"]:
-                found=True
-                p_uuid=dict["patient_id"]
-                if dict["phone_number"]!=p_phone:
-                    raise VaccineManagementException("Phone numbers are different")
-
-        if not found:
+        with phase("patient_lookup"):
+            solicitud = self.__storage.find_patient(p_id)
+        if solicitud is None:
             raise VaccineManagementException("This patient is not registered")
-
-        date=VaccinationAppoinment(p_uuid, p_id, p_phone, 10)
-        date_dict={"patient_id": date.patient_id, "phone_number": date.phone_number,
-                   "vaccine_date": str(datetime.fromtimestamp(int(float(date.appoinment_date))))[0:10],
-                   "patient_system_id": date.patient_sys_id, "date_signature": date.vaccination_signature}
-
-        with open(self.vaccination_appointments, "r+",
-                  encoding="utf-8") as file:
-
-            data = json.load(file)
-            found=False
-            data.append(date_dict)
-            file.seek(0)
-            json.dump(data, file, indent=2)
-
-        return date.vaccination_signature
+        if solicitud["phone_number"]!=p_phone:
+            raise VaccineManagementException("Phone numbers are different")
+        p_uuid=solicitud["patient_id"]
+
+        days = 10
+        if book is not None:
+            # El primer dia posible sigue siendo el decimo, si esta lleno se pasa al siguiente libre
+            with phase("slot_allocation"):
+                today = datetime.utcnow().date()
+                vaccine_day, _ = book(today + timedelta(days=days), center)
+                days = (vaccine_day - today).days
+        elif center is not None:
+            raise VaccineManagementException("Invalid vaccination center")
+
+        with phase("hashing"):
+            date=VaccinationAppoinment(p_uuid, p_id, p_phone, days)
+            date_dict={"patient_id": date.patient_id, "phone_number": date.phone_number,
+                       "vaccine_date": str(datetime.fromtimestamp(int(float(date.appoinment_date))))[0:10],
+                       "patient_system_id": date.patient_sys_id, "date_signature": date.vaccination_signature}
+        return date, date_dict
 
 #RF3
 
     def vaccine_patient(self, date_signature):
         """RF3"""
+        with self.__operation("vaccine_patient"):
+            # date_signature representa la firma obtenida en la funcion 2
+
+            # Compruebo formato
+            with phase("validation"):
+                self.__validate_signature(date_signature)
+
+            # Busco la cita por su firma en el almacen de citas
+            with phase("appointment_lookup"), self.__storage_errors():
+                cita = self.__storage.find_appointment(date_signature)
 
-        # date_signature representa la firma obtenida en la funcion 2
+            towrite = self.__administration(date_signature, cita, str(datetime.utcnow()))
 
-        # Compruebo formato
+            # Al guardar compruebo si da algun error (si el archivo esta vacio se guarda como una lista nueva)
+            with phase("storage_write"), self.__storage_errors():
+                self.__storage.add_administrations([towrite])
+            return True
+
+    def vaccine_patients(self, date_signatures) -> list:
+        """
+        Registers the vaccination of several appointments, looking all of them up
+        at once and saving all the vaccinations in a single write
+        :param date_signatures: iterable of signatures returned by get_vaccine_date
+        :return: list with one dict per signature, in the same order, with the keys
+        "date_signature", "vaccinated" (bool) and "error" (message of the
+        VaccineManagementException, None if it is vaccinated)
+        :raises: VaccineManagementException: If the stores cannot be read or written
+        """
+        with self.__operation("vaccine_patients"):
+            date_signatures = list(date_signatures)
+            # Todas las vacunaciones del lote tienen la misma fecha de acceso
+            actual = str(datetime.utcnow())
+            valid = []
+            with phase("validation"):
+                for date_signature in date_signatures:
+                    try:
+                        self.__validate_signature(date_signature)
+                    except VaccineManagementException:
+                        continue
+                    valid.append(date_signature)
+
+            with phase("appointment_lookup"), self.__storage_errors():
+                citas = self.__storage.find_appointments(valid)
+
+            results = []
+            records = []
+            for date_signature in date_signatures:
+                try:
+                    self.__validate_signature(date_signature)
+                    records.append(self.__administration(date_signature, citas.get(date_signature), actual))
+                except VaccineManagementException as error:
+                    results.append({"date_signature": date_signature, "vaccinated": False, "error": error.message})
+                    continue
+                results.append({"date_signature": date_signature, "vaccinated": True, "error": None})
+
+            if records:
+                with phase("storage_write"), self.__storage_errors():
+                    self.__storage.add_administrations(records)
+            return results
+
+    @staticmethod
+    def __validate_signature(date_signature):
+        """Checks the format of a date_signature
+        :raises: VaccineManagementException: If it is not a 64 characters string"""
         if date_signature is None or type(date_signature) != str or len(date_signature) != 64:
             raise VaccineManagementException("Invalid signature")
 
-        # Abro el archivo json
-        path_file = self.vaccination_appointments
-
-        # Compruebo que no haya errores al abrir el archivo
+    @staticmethod
+    @contextmanager
+    def __storage_errors():
+        """Raises the errors of the store files as VaccineManagementException"""
         try:
-            with open(path_file, 'r', encoding="utf-8") as file:
-                data = json.load(file)
-                file.close()
+            yield
         except FileNotFoundError as ex:
             raise VaccineManagementException("Error while opening the file") from ex
         except json.JSONDecodeError as ex:
             raise VaccineManagementException("Error while decoding JSON") from ex
 
-        # Compruebo que tiene el formato correcto (para cada diccionario)
-        for n_data in data:
-            if list(n_data.keys()) != ["patient_id", "phone_number", "vaccine_date", "patient_system_id", "date_signature"]:
-                raise VaccineManagementException("Invalid appointments JSON format")
-
-        # Compruebo si la firma es valida (si la firma se encuentra en el json)
-        encontrado = False
-        # Este indice nos indica en que indice esta la firma dentro del json (para luego comprobar su fecha)
-        indice = 0
-        for n_data in data:
-            if n_data["date_signature"] == date_signature:
-                encontrado = True
-            elif n_data["date_signature"] != date_signature:
-                indice += 1
-            if encontrado:
-                break
-
+    @staticmethod
+    def __administration(date_signature, cita, actual):
+        """Checks the appointment found for date_signature and returns the
+        registered vaccination to be saved, with actual as Access_date
+        :raises: VaccineManagementException: If there is no appointment or it is for today"""
         # Si no la he encontrado, lanzo una excepcion
-        if not encontrado:
+        if cita is None:
             raise VaccineManagementException("Invalid date_signature")
 
         # Si no hay excepcion, la firma está dentro, por lo que paso a comprobar la fecha
-        actual = str(datetime.utcnow())
         actualday = actual[0:10]
-        if data[indice]['vaccine_date'] == actualday:
+        if cita['vaccine_date'] == actualday:
             raise VaccineManagementException("Invalid vaccine date")
 
         # Sitodo es correcto, registro vacunacion
         # Guardo en un json, el diccionario siguiente (con lo que nos piden: fecha de acceso y firma)
-        towrite = {"Access_date": actual,
-                       "Key_value": date_signature}
-        # Al abrir el archivo compruebo si da algun error
-
-        # El primer try hara saltar excepciones si el archivo no existe, o si no tiene los [] si está vacio
-        try:
-            with open(self.registered_vaccinations, 'r+', encoding='utf-8') as json_file:
-                # Con este try simplemente compruebo si esta vacio o no, para poder hacer el json.load sin errores
-                try:
-                    datos = json.load(json_file)
-                    datos.append(towrite)
-                    json_file.seek(0)
-                    json.dump(datos, json_file, indent=2)
-
-                except json.JSONDecodeError:
-                    # Al estar vacio, simplemente lo añado directamente (ya que si hago el load estando vacio, dara error)
-                    json.dump(towrite, json_file, indent=2)
-
-                return True
-
-        except FileNotFoundError as ex:
-            raise VaccineManagementException("Error while opening the file") from ex
-        except FileExistsError as ex:
-            raise VaccineManagementException("Error while opening the file") from ex
-        except json.JSONDecodeError as ex:
-            raise VaccineManagementException("Error while decoding JSON") from ex
+        return {"Access_date": actual,
+                "Key_value": date_signature}
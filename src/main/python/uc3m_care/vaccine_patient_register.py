@@ -7,6 +7,10 @@ from datetime import datetime
 class VaccinePatientRegister:
     """Class representing the register of the patient in the system"""
 
+    # Sin __dict__ por instancia, en las cargas masivas hay millones de registros
+    __slots__ = ("__patient_id", "__name_surname", "__registration_type", "__phone_number",
+                 "__age", "__time_stamp", "__patient_system_id", "__full_name")
+
     def __init__(self, patient_id, full_name, registration_type, phone_number, age):
         self.__patient_id = patient_id
         self.__name_surname = full_name
@@ -0,0 +1,146 @@
+"""Contains the class WalStore"""
+import json
+import os
+
+from uc3m_care import instrumentation
+from uc3m_care.json_store import JsonStore, JSON_FORMAT, JSON_LINES_FORMAT
+
+WAL_BASE = "wal_base"
+
+
+class WalStore:
+    """Class representing a store made of a snapshot file and a write-ahead log
+
+    The snapshot is a JsonStore at path, in any of its layouts, so it can still
+    be read as a plain store. New records are only appended to the log,
+    "<path>.wal", one JSON line each, so a write costs the same whatever the
+    size of the store. The records are the ones of the snapshot followed by the
+    ones of the log; a line that was being written when a process crashed is
+    ignored and dropped on the next write.
+
+    When the log grows over compact_size bytes it is folded into a new
+    snapshot. The first line of the log keeps the number of records of the
+    snapshot it continues ({"wal_base": n}); as records are never removed, a
+    snapshot written by a compaction that crashed before emptying the log
+    has more records than that, and the log records it already contains are
+    skipped.
+
+    It offers the same reading and writing methods as JsonStore and uses the
+    lock of the snapshot, so it can be used wherever a JsonStore is used.
+    """
+
+    def __init__(self, path, store_format=JSON_FORMAT, compact_size=1 << 20):
+        """
+        :param path: path of the snapshot file, the log is path + ".wal"
+        :param store_format: layout of the snapshot (see JsonStore)
+        :param compact_size: size in bytes of the log from which it is compacted
+        """
+        self.__snapshot = JsonStore(path, store_format)
+        self.__log = JsonStore(path + ".wal", JSON_LINES_FORMAT)
+        self.__compact_size = compact_size
+
+    @property
+    def path(self):
+        """Property that represents the path of the snapshot file"""
+        return self.__snapshot.path
+
+    @property
+    def log_path(self):
+        """Property that represents the path of the write-ahead log"""
+        return self.__log.path
+
+    @property
+    def store_format(self):
+        """Property that represents the layout of the snapshot file"""
+        return self.__snapshot.store_format
+
+    @property
+    def appendable(self):
+        """Property that is False, the snapshot is rewritten by the compactions"""
+        return False
+
+    def file_format(self):
+        """Returns the layout of the snapshot file on disk"""
+        return self.__snapshot.file_format()
+
+    def state(self):
+        """Returns the states of the snapshot and of the log"""
+        return self.__snapshot.state(), self.__log.state()
+
+    def load(self):
+        """Returns the list of records of the snapshot followed by the ones of the log
+        :raises: FileNotFoundError if the snapshot does not exist
+        :raises: json.JSONDecodeError if the content is not valid"""
+        return list(self.iter_records())
+
+    def iter_records(self, chunk_size=65536, copy=True):
+        """Yields the records of the snapshot while it is read and then the ones of the log.
+        With copy=False the records of a cached snapshot are the ones of the cache
+        :raises: FileNotFoundError if the snapshot does not exist
+        :raises: json.JSONDecodeError if the content is not valid"""
+        # El log se lee antes que el snapshot: si entre medias se compacta, sus
+        # registros ya estan en el snapshot nuevo y se saltan por el wal_base
+        base, log_records = self.__read_log()
+        count = 0
+        for record in self.__snapshot_records(chunk_size, copy):
+            count += 1
+            yield record
+        yield from log_records[max(0, count - base):]
+
+    def append(self, record):
+        """Adds one record at the end of the log
+        :return: states of the store just before and just after the write"""
+        return self.extend([record])
+
+    def extend(self, records):
+        """Adds a list of records at the end of the log in a single write, and
+        compacts the log if it has grown over compact_size
+        :return: states of the store just before and just after the write
+        :raises: FileNotFoundError if the snapshot does not exist"""
+        with self.__snapshot.lock():
+            before = self.state()
+            self.__log.drop_partial_record()
+            header = []
+            if self.__log.state() is None or self.__log.state()[1] == 0:
+                # El log empieza en el snapshot actual
+                header = [{WAL_BASE: sum(1 for _ in self.__snapshot_records())}]
+            content = "".join(json.dumps(record) + "\n" for record in header + records).encode("utf-8")
+            with open(self.__log.path, "ab") as file:
+                file.write(content)
+                file.flush()
+                os.fsync(file.fileno())
+            instrumentation.count(instrumentation.BYTES_WRITTEN, len(content))
+            if os.path.getsize(self.__log.path) > self.__compact_size:
+                self.__compact()
+            return before, self.state()
+
+    def compact(self):
+        """Folds the log into a new snapshot and empties the log"""
+        with self.__snapshot.lock():
+            self.__compact()
+
+    def __compact(self):
+        """Folds the log into a new snapshot, holding the lock"""
+        records = self.load()
+        # Primero el snapshot y luego el log, cada uno de forma atomica
+        self.__snapshot.rewrite(records)
+        with open(self.__log.path, "ab"):
+            pass
+        self.__log.rewrite([{WAL_BASE: len(records)}])
+
+    def __snapshot_records(self, chunk_size=65536, copy=True):
+        """Yields the records of the snapshot, an empty file is an empty list"""
+        with open(self.__snapshot.path, "rb") as file:
+            if not file.read(4096).strip():
+                return
+        yield from self.__snapshot.iter_records(chunk_size, copy)
+
+    def __read_log(self):
+        """Returns the wal_base of the log and its records, (0, []) if there is no log"""
+        try:
+            lines = self.__log.load()
+        except FileNotFoundError:
+            return 0, []
+        if not lines:
+            return 0, []
+        return lines[0][WAL_BASE], lines[1:]
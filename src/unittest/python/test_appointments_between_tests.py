@@ -0,0 +1,133 @@
+"""Tests de la busqueda de citas por rango de fechas"""
+import json
+import os
+import tempfile
+from datetime import date, datetime
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.json_store import msgpack
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.sqlite_storage import SqliteStorage
+from uc3m_care.sharded_storage import ShardedStorage
+
+
+def cita(vaccine_date, signature):
+    """Devuelve una cita del almacen de citas"""
+    return {"patient_id": "43831e01-cd0f-4b97-aa6d-c071b42129f0", "phone_number": "123456789",
+            "vaccine_date": vaccine_date, "patient_system_id": "72b72255619afeed8bd26861a2bc2caf",
+            "date_signature": signature * 64}
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        paths = [os.path.join(self.folder.name, name) for name in
+                 ["patient_registry.json", "vaccination_appointments.json", "registered_vaccinations.json"]]
+        for path in paths:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump([], file)
+        self.appointments = paths[1]
+        self.sqlite = SqliteStorage(":memory:")
+        self.storages = {"memory": MemoryStorage(), "json": JsonStorage(*paths), "sqlite": self.sqlite,
+                         "sharded": ShardedStorage([MemoryStorage(), MemoryStorage()])}
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.sqlite.close()
+        self.folder.cleanup()
+
+    def test_rango_en_todos_los_almacenes(self):
+        """Se comprueba que cada almacen devuelve las citas del rango ordenadas por fecha"""
+        for name, storage in self.storages.items():
+            with self.subTest(storage=name):
+                storage.add_appointments([cita("2020-05-08", "a"), cita("2020-05-06", "b")])
+                storage.add_appointments([cita("2020-05-07", "c"), cita("2020-05-06", "d"), cita("2020-06-01", "e")])
+                vaccine_manager = VaccineManager(storage=storage)
+                found = [appointment["date_signature"][0] for appointment in
+                         vaccine_manager.appointments_between("2020-05-06", date(2020, 5, 7))]
+                self.assertEqual(found[:2] if name != "sharded" else sorted(found[:2]), ["b", "d"])
+                self.assertEqual(found[2:], ["c"])
+                self.assertEqual(len(list(vaccine_manager.appointments_between("2020-5-1", "2020-12-31"))), 5)
+                self.assertEqual(list(vaccine_manager.appointments_between("2020-05-09", "2020-05-31")), [])
+                self.assertEqual(list(vaccine_manager.appointments_between("2020-06-01", "2020-05-01")), [])
+
+    def test_indice_json_ve_cambios_externos(self):
+        """Se comprueba que el indice de fechas de JsonStorage ve las citas que escribe otro proceso"""
+        storage = self.storages["json"]
+        storage.add_appointments([cita("2020-05-06", "a")])
+        self.assertEqual(len(list(storage.appointments_between("2020-05-06", "2020-05-06"))), 1)
+        JsonStorage(os.devnull, self.appointments, os.devnull).add_appointments([cita("2020-05-06", "b")])
+        self.assertEqual(len(list(storage.appointments_between("2020-05-06", "2020-05-06"))), 2)
+
+    def test_indice_json_formatos_por_lineas(self):
+        """Se comprueba que en jsonl y msgpack las citas escritas no se indexan dos veces"""
+        for store_format in ["jsonl", "msgpack"]:
+            if store_format == "msgpack" and msgpack is None:
+                continue
+            with self.subTest(store_format=store_format):
+                appointments = os.path.join(self.folder.name, "appointments." + store_format)
+                storage = JsonStorage(os.devnull, appointments, os.devnull, store_format=store_format)
+                storage.add_appointments([cita("2020-05-06", "a")])
+                self.assertEqual(len(list(storage.appointments_between("2020-05-06", "2020-05-06"))), 1)
+                storage.add_appointments([cita("2020-05-06", "b")])
+                storage.add_appointments([cita("2020-05-06", "c")])
+                self.assertEqual(len(list(storage.appointments_between("2020-05-06", "2020-05-06"))), 3)
+                self.assertEqual(storage.find_appointment("c" * 64)["date_signature"], "c" * 64)
+                # Lo que escribe otro proceso entre medias tambien se lee una sola vez
+                other = JsonStorage(os.devnull, appointments, os.devnull, store_format=store_format)
+                other.add_appointments([cita("2020-05-06", "d")])
+                storage.add_appointments([cita("2020-05-06", "e")])
+                self.assertEqual([appointment["date_signature"][0] for appointment in
+                                  storage.appointments_between("2020-05-06", "2020-05-06")], list("abcde"))
+
+    def test_fechas_no_validas(self):
+        """Se comprueba que las fechas que no son validas lanzan una excepcion"""
+        vaccine_manager = VaccineManager(storage=MemoryStorage())
+        for value in ["06/05/2020", "2020-02-30", None, 20200506]:
+            with self.subTest(value=value):
+                with self.assertRaises(VaccineManagementException) as exception:
+                    vaccine_manager.appointments_between(value, "2020-05-06")
+                self.assertEqual(exception.exception.message, "Invalid date")
+        self.assertEqual(list(vaccine_manager.appointments_between(datetime(2020, 5, 6, 12), "2020-05-06")), [])
+
+    def test_errores_del_fichero(self):
+        """Se comprueba que el fichero de citas se lee al llamar y sus errores son VaccineManagementException"""
+        vaccine_manager = VaccineManager(storage=self.storages["json"])
+        appointments = vaccine_manager.appointments_between("2020-05-06", "2020-05-06")
+        with open(self.appointments, "w", encoding="utf-8") as file:
+            json.dump([cita("2020-05-06", "a")], file)
+        # Las citas ya se seleccionaron antes de cambiar el fichero
+        self.assertEqual(list(appointments), [])
+        for contenido, message in [("[{", "Error while decoding JSON"), (None, "Error while opening the file")]:
+            with self.subTest(message=message):
+                if contenido is None:
+                    os.remove(self.appointments)
+                else:
+                    with open(self.appointments, "w", encoding="utf-8") as file:
+                        file.write(contenido)
+                with self.assertRaises(VaccineManagementException) as exception:
+                    vaccine_manager.appointments_between("2020-05-06", "2020-05-06")
+                self.assertEqual(exception.exception.message, message)
+
+    @freeze_time("2020-04-26")
+    def test_citas_del_gestor(self):
+        """Se comprueba que las citas de get_vaccine_date se encuentran por su fecha"""
+        folder = self.folder.name
+
+        class TmpManager(VaccineManager):
+            """Gestor que guarda los ficheros de pacientes en una carpeta temporal"""
+            json_collection = folder
+
+        vaccine_manager = TmpManager(storage=self.storages["json"])
+        patient_system_id = vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0",
+                                                                   "Regular", "Ana Lopez", "123456789", 20)
+        self.assertEqual(list(vaccine_manager.appointments_between("2020-05-06", "2020-05-06")), [])
+        signature = vaccine_manager.get_vaccine_date(vaccine_manager.generate_json(patient_system_id, "123456789"))
+        self.assertEqual([appointment["date_signature"] for appointment in
+                          vaccine_manager.appointments_between("2020-05-06", "2020-05-06")], [signature])
@@ -0,0 +1,66 @@
+"""Tests de la clase AsyncVaccineManager"""
+import asyncio
+import tempfile
+import uuid
+from unittest import IsolatedAsyncioTestCase
+from freezegun import freeze_time
+from uc3m_care.async_vaccine_manager import AsyncVaccineManager
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.memory_storage import MemoryStorage
+
+
+class MyTestCase(IsolatedAsyncioTestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.patient_data = {
+            "patient_id": "43831e01-cd0f-4b97-aa6d-c071b42129f0",
+            "name_surname": "Fernando Alonso",
+            "registration_type": "Family",
+            "phone_number": "123456789",
+            "age": 20,
+        }
+        self.storage = MemoryStorage()
+        self.folder = tempfile.TemporaryDirectory()
+        folder = self.folder.name
+
+        class TmpManager(VaccineManager):
+            """Gestor que genera los ficheros de pacientes en una carpeta temporal"""
+            json_collection = folder
+
+        self.vaccine_manager = AsyncVaccineManager(TmpManager(storage=self.storage))
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.vaccine_manager.close()
+        self.folder.cleanup()
+
+    @freeze_time("2020-04-26")
+    async def test_proceso_completo(self):
+        """Se comprueba que las tres funciones asincronas funcionan igual que las sincronas"""
+        patient_system_id = await self.vaccine_manager.request_vaccination_id(**self.patient_data)
+        path = self.vaccine_manager.vaccine_manager.generate_json(patient_system_id, "123456789")
+        signature = await self.vaccine_manager.get_vaccine_date(path)
+        self.assertEqual(self.storage.appointments[0]["vaccine_date"], "2020-05-06")
+        self.assertEqual(await self.vaccine_manager.vaccine_patient(signature), True)
+        self.assertEqual(self.storage.administrations[0]["Key_value"], signature)
+
+    async def test_peticiones_concurrentes(self):
+        """Se comprueba que muchas peticiones a la vez se guardan todas"""
+        patients = [dict(self.patient_data, patient_id=str(uuid.uuid4())) for _ in range(20)]
+        results = await asyncio.gather(*[self.vaccine_manager.request_vaccination_id(**patient)
+                                         for patient in patients])
+        self.assertEqual(len(self.storage.patients), 20)
+        for patient_system_id in results:
+            self.assertIsNotNone(self.storage.find_patient(patient_system_id))
+
+    async def test_excepcion(self):
+        """Se comprueba que las excepciones del gestor llegan al que espera la operacion"""
+        with self.assertRaises(VaccineManagementException) as exception:
+            await self.vaccine_manager.vaccine_patient("1234")
+        self.assertEqual(exception.exception.message, "Invalid signature")
+        results = await self.vaccine_manager.request_vaccination_ids(iter([self.patient_data, ("a", "Regular", "Ana Lopez", "123456789", 20)]))
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[1]["error"], "Invalid patient ID")
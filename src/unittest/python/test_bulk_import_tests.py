@@ -0,0 +1,87 @@
+"""Tests de la importacion de pacientes desde un CSV"""
+import contextlib
+import hashlib
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase
+from uc3m_care.bulk_import import main, import_csv
+from uc3m_care.memory_storage import MemoryStorage
+
+HEADER = "patient_id,registration_type,name_surname,phone_number,age,otra\n"
+ROWS = ["43831e01-cd0f-4b97-aa6d-c071b42129f0,Regular,Ana Lopez,123456789,20,x\n",
+        "bb5dbd6f-d8b4-413f-8eb9-dd262cfc54e0,Family,Luis Perez,987654321,30,y\n",
+        "no es un uuid,Regular,Ana Lopez,123456789,20,z\n",
+        "43831e01-cd0f-4b97-aa6d-c071b42129f0,Regular,Ana Lopez,123456789,veinte,w\n"]
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.csv = os.path.join(self.folder.name, "patients.csv")
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def escribir_csv(self, rows, header=HEADER):
+        """Escribe el CSV de pacientes"""
+        with open(self.csv, "w", encoding="utf-8") as file:
+            file.write(header + "".join(rows))
+
+    def test_importacion_con_procesos(self):
+        """Se comprueba que los pacientes validos se guardan con su MD5 y los demas se rechazan"""
+        self.escribir_csv(ROWS * 5)
+        storage = MemoryStorage()
+        stats = import_csv(self.csv, storage, processes=2, chunk_size=3)
+        self.assertEqual(stats["rows"], 20)
+        self.assertEqual(stats["registered"], 10)
+        self.assertEqual([line for line, _ in stats["errors"]][:2], [4, 5])
+        self.assertEqual(stats["errors"][:2], [(4, "Invalid patient ID"), (5, "Invalid age")])
+        patients = list(storage.iter_patients())
+        self.assertEqual([patient["name_surname"] for patient in patients[:2]], ["Ana Lopez", "Luis Perez"])
+        self.assertEqual(patients[0]["age"], 20)
+        data = {key: value for key, value in patients[0].items() if key != "patient_system_id"}
+        self.assertEqual(patients[0]["patient_system_id"], hashlib.md5(json.dumps(data).encode("utf-8")).hexdigest())
+
+    def test_edad_que_no_es_un_entero(self):
+        """Se comprueba que una edad con digitos que int no acepta rechaza solo esa fila"""
+        self.escribir_csv([ROWS[0], ROWS[1].replace(",30,", ",2\u00b2,")])
+        storage = MemoryStorage()
+        stats = import_csv(self.csv, storage, processes=1)
+        self.assertEqual(stats["errors"], [(3, "Invalid age")])
+        self.assertEqual(stats["registered"], 1)
+
+    def test_comando(self):
+        """Se comprueba que el comando escribe el registro de una vez e imprime las estadisticas"""
+        self.escribir_csv(ROWS)
+        db = os.path.join(self.folder.name, "db")
+        output = io.StringIO()
+        errors = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(errors):
+            code = main([self.csv, "--db", db, "--processes", "1"])
+        self.assertEqual(code, 1)
+        with open(os.path.join(db, "patient_registry.json"), "r", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)), 2)
+        self.assertIn("line 4: Invalid patient ID", errors.getvalue())
+        self.assertIn("2 rejected", output.getvalue())
+        self.assertIn("wrote            2 patients", output.getvalue())
+
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main([self.csv, "--db", db, "--registry-format", "jsonl", "--processes", "1"]), 1)
+        # El registro en json se convierte a jsonl y se le añaden los nuevos
+        with open(os.path.join(db, "patient_registry.json"), "r", encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+    def test_columnas_que_faltan(self):
+        """Se comprueba que un CSV sin las columnas necesarias no se importa"""
+        self.escribir_csv(ROWS[:1], header="patient_id,registration_type\n")
+        errors = io.StringIO()
+        with contextlib.redirect_stderr(errors):
+            code = main([self.csv, "--db", os.path.join(self.folder.name, "db")])
+        self.assertEqual(code, 2)
+        self.assertIn("Missing CSV columns: name_surname, phone_number, age", errors.getvalue())
@@ -1,6 +1,7 @@
 """Tests de la funcion get_vaccine_date()"""
 
 import json
+import tempfile
 from unittest import TestCase
 from pathlib import Path
 from freezegun import freeze_time
@@ -185,6 +186,77 @@ class MyTestCase(TestCase):
 
         self.assertEqual(found, True)
 
+    @freeze_time("2020-04-26")
+    def test_citas_por_lotes_directorio(self):
+        """Se comprueba que get_vaccine_dates procesa todos los json de un directorio
+        y guarda solo las citas correctas"""
+        vaccine_manager = VaccineManager()
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que genera los ficheros de pacientes en una carpeta temporal"""
+                json_collection = folder
+
+            tmp_manager = TmpManager()
+            tmp_manager.generate_json(self.patient_system_id, "123456789")
+            tmp_manager.generate_json("hb545bec6cd4468c3c0736520a4328db", "123456789")
+            with open(folder + "/roto.json", "w", encoding="utf-8") as file:
+                file.write("{")
+            results = vaccine_manager.get_vaccine_dates(folder)
+
+        errores = {result["file"][len(folder) + 1:]: result["error"] for result in results}
+        self.assertEqual(errores, {self.patient_system_id + ".json": None,
+                                   "hb545bec6cd4468c3c0736520a4328db.json": "This patient is not registered",
+                                   "roto.json": "Error while decoding JSON"})
+        signature = [result["date_signature"] for result in results if result["error"] is None][0]
+        signature_2 = VaccinationAppoinment(self.patient_data["patient_id"], self.patient_system_id, "123456789", 10).vaccination_signature
+        self.assertEqual(signature, signature_2)
+        with open(self.direccion + "/db/vaccination_appointments.json", "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data[-1]["date_signature"], signature)
+
+    @freeze_time("2020-04-26")
+    def test_citas_por_lotes_ficheros_no_validos(self):
+        """Se comprueba que un fichero que no es un objeto JSON o no es UTF-8 solo da error
+        en ese fichero y se guardan las citas del resto"""
+        vaccine_manager = VaccineManager()
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que genera los ficheros de pacientes en una carpeta temporal"""
+                json_collection = folder
+
+            path = TmpManager().generate_json(self.patient_system_id, "123456789")
+            with open(folder + "/lista.json", "w", encoding="utf-8") as file:
+                file.write("[1]")
+            with open(folder + "/latin1.json", "wb") as file:
+                file.write('{"PatientSystemID": "Ñ"}'.encode("latin-1"))
+            results = vaccine_manager.get_vaccine_dates([folder + "/lista.json", path, folder + "/latin1.json"])
+
+        self.assertEqual([result["error"] for result in results],
+                         ["Invalid JSON structure", None, "Error while decoding JSON"])
+        with open(self.direccion + "/db/vaccination_appointments.json", "r", encoding="utf-8") as file:
+            data = json.load(file)
+        self.assertEqual(data[-1]["date_signature"], results[1]["date_signature"])
+
+    def test_citas_por_lotes_lista(self):
+        """Se comprueba que get_vaccine_dates acepta una lista de ficheros"""
+        vaccine_manager = VaccineManager()
+        path = vaccine_manager.generate_json(self.patient_system_id, "123456789")
+        results = vaccine_manager.get_vaccine_dates([path, 12345])
+        self.assertEqual(len(results[0]["date_signature"]), 64)
+        self.assertEqual(results[1], {"file": 12345, "date_signature": None, "error": "Invalid input type"})
+
+    @freeze_time("2020-04-26")
+    def test_firma_calculada_una_vez(self):
+        """Se comprueba que la firma se guarda al leerla y cambia si cambia el patient_sys_id"""
+        date = VaccinationAppoinment(self.patient_data["patient_id"], self.patient_system_id, "123456789", 10)
+        signature = date.vaccination_signature
+        self.assertIs(date.vaccination_signature, signature)
+        date.patient_sys_id = "0" * 32
+        self.assertNotEqual(date.vaccination_signature, signature)
+        date.patient_sys_id = self.patient_system_id
+        self.assertEqual(date.vaccination_signature, signature)
+        self.assertFalse(hasattr(date, "__dict__"))
+
 
 if __name__ == '__main__':
     unittest.main()
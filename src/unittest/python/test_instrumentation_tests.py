@@ -0,0 +1,121 @@
+"""Tests de la clase Instrumentation"""
+import os
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.instrumentation import Instrumentation, MetricsCollector, phase, count
+from uc3m_care.read_cache import READ_CACHE
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.paths = [os.path.join(self.folder.name, name) for name in
+                      ["patient_registry.json", "vaccination_appointments.json", "registered_vaccinations.json"]]
+        for path in self.paths:
+            with open(path, "w", encoding="utf-8") as file:
+                file.write("[]")
+        self.events = []
+        self.collector = MetricsCollector()
+        self.vaccine_manager = VaccineManager(storage=JsonStorage(*self.paths),
+                                              instrumentation=Instrumentation(self.events.append, self.collector))
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def fases(self, operation):
+        """Devuelve un dict fase -> evento de la ultima llamada a operation"""
+        return {event.phase: event for event in self.events if event.operation == operation}
+
+    @freeze_time("2020-04-26")
+    def test_fases_de_las_operaciones(self):
+        """Se comprueba que cada operacion emite sus fases con los contadores de los almacenes"""
+        patient_system_id = self.vaccine_manager.request_vaccination_id(
+            "43831e01-cd0f-4b97-aa6d-c071b42129f0", "Regular", "Ana Lopez", "123456789", 20)
+        phases = self.fases("request_vaccination_id")
+        self.assertEqual(set(phases), {"total", "validation", "hashing", "storage_write"})
+        self.assertGreater(phases["storage_write"].counters["bytes_written"], 0)
+        self.assertEqual(phases["total"].counters, phases["storage_write"].counters)
+        self.assertTrue(phases["total"].ok)
+        self.assertGreaterEqual(phases["total"].seconds, phases["hashing"].seconds)
+
+        input_file = os.path.join(self.folder.name, "patient.json")
+        with open(input_file, "w", encoding="utf-8") as file:
+            file.write('{"PatientSystemID": "%s", "ContactPhoneNumber": "123456789"}' % patient_system_id)
+        # Sin cache el registro se vuelve a leer del fichero
+        READ_CACHE.clear()
+        signature = self.vaccine_manager.get_vaccine_date(input_file)
+        phases = self.fases("get_vaccine_date")
+        self.assertEqual(set(phases), {"total", "read_input", "patient_lookup", "hashing", "storage_write"})
+        self.assertEqual(phases["patient_lookup"].counters["records_scanned"], 1)
+        self.assertEqual(phases["patient_lookup"].counters["bytes_read"], os.path.getsize(self.paths[0]))
+
+        self.vaccine_manager.vaccine_patient(signature)
+        phases = self.fases("vaccine_patient")
+        self.assertEqual(set(phases), {"total", "validation", "appointment_lookup", "storage_write"})
+        # Las citas se acaban de escribir, se leen de la cache sin tocar el fichero
+        self.assertEqual(phases["appointment_lookup"].counters, {"cache_hits": 1})
+
+    def test_operacion_con_error(self):
+        """Se comprueba que una operacion que lanza una excepcion tambien se mide"""
+        with self.assertRaises(VaccineManagementException):
+            self.vaccine_manager.vaccine_patient("1" * 64)
+        self.assertFalse(self.fases("vaccine_patient")["total"].ok)
+        self.assertEqual(self.collector.operations()["vaccine_patient"]["errors"], 1)
+
+    def test_lote_agrega_las_fases(self):
+        """Se comprueba que en un lote cada fase se emite una vez con el numero de llamadas"""
+        patients = [("43831e01-cd0f-4b97-aa6d-c071b42129f0", "Regular", "Ana Lopez", "123456789", 20)] * 3
+        self.vaccine_manager.request_vaccination_ids(patients + [("no", "Regular", "Ana Lopez", "123456789", 20)])
+        phases = self.fases("request_vaccination_ids")
+        self.assertEqual(len(self.events), 4)
+        self.assertEqual(phases["validation"].calls, 4)
+        self.assertEqual(phases["hashing"].calls, 3)
+        self.assertEqual(phases["storage_write"].calls, 1)
+
+    def test_citas_entre_fechas(self):
+        """Se comprueba que appointments_between se mide y que recorrer sus citas queda fuera"""
+        appointments = self.vaccine_manager.appointments_between("2020-05-06", "2020-05-07")
+        phases = self.fases("appointments_between")
+        self.assertEqual(set(phases), {"total", "validation", "storage_read"})
+        self.assertTrue(phases["total"].ok)
+        self.events.clear()
+        self.assertEqual(list(appointments), [])
+        self.assertEqual(self.events, [])
+        with self.assertRaises(VaccineManagementException):
+            self.vaccine_manager.appointments_between("no", "2020-05-07")
+        self.assertEqual(self.collector.operations()["appointments_between"]["errors"], 1)
+
+    def test_sin_instrumentacion(self):
+        """Se comprueba que fuera de una operacion las fases y los contadores no hacen nada"""
+        with phase("validation"):
+            count("records_scanned")
+        vaccine_manager = VaccineManager(storage=MemoryStorage())
+        vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0", "Regular",
+                                               "Ana Lopez", "123456789", 20)
+        self.assertEqual(self.events, [])
+
+    def test_formato_prometheus(self):
+        """Se comprueba el fichero de metricas en el formato de texto de Prometheus"""
+        for _ in range(2):
+            self.vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0", "Regular",
+                                                        "Ana Lopez", "123456789", 20)
+        path = os.path.join(self.folder.name, "metrics.prom")
+        self.collector.write_prometheus(path)
+        with open(path, "r", encoding="utf-8") as file:
+            lines = file.read().splitlines()
+        self.assertIn("# TYPE uc3m_care_operation_calls_total counter", lines)
+        self.assertIn('uc3m_care_operation_calls_total{operation="request_vaccination_id"} 2', lines)
+        self.assertIn('uc3m_care_phase_calls_total{operation="request_vaccination_id",phase="hashing"} 2', lines)
+        self.assertIn('uc3m_care_operation_errors_total{operation="request_vaccination_id"} 0', lines)
+        written = self.collector.phases()[("request_vaccination_id", "storage_write")]["bytes_written"]
+        self.assertIn('uc3m_care_phase_bytes_written_total{operation="request_vaccination_id",'
+                      'phase="storage_write"} %d' % written, lines)
@@ -0,0 +1,95 @@
+"""Tests de la clase JsonStoreIndex"""
+import json
+import tempfile
+from unittest import TestCase, skipIf
+from uc3m_care.json_store import JsonStore, msgpack
+from uc3m_care.json_store_index import JsonStoreIndex
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = self.folder.name + "/store.json"
+        self.path_lines = self.folder.name + "/store.jsonl"
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"id": "a", "valor": 1}], file)
+        with open(self.path_lines, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"id": "a", "valor": 1}) + "\n")
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def test_busqueda_correcta(self):
+        """Se comprueba que el indice devuelve el registro con esa clave"""
+        index = JsonStoreIndex(JsonStore(self.path), "id")
+        self.assertEqual(index.get("a"), {"id": "a", "valor": 1})
+        self.assertIsNone(index.get("b"))
+
+    def test_add_sincroniza_indice(self):
+        """Se comprueba que los registros escritos por el gestor aparecen en el indice"""
+        store = JsonStore(self.path)
+        index = JsonStoreIndex(store, "id")
+        index.get("a")
+        states = store.append({"id": "b", "valor": 2})
+        index.update([{"id": "b", "valor": 2}], states)
+        self.assertEqual(index.get("b"), {"id": "b", "valor": 2})
+
+    def test_cambio_externo_recarga(self):
+        """Se comprueba que si otro proceso modifica el fichero el indice se recarga"""
+        index = JsonStoreIndex(JsonStore(self.path), "id")
+        index.get("a")
+        JsonStore(self.path).append({"id": "c", "valor": 3})
+        self.assertEqual(index.get("c"), {"id": "c", "valor": 3})
+
+    def test_jsonl_lee_solo_lineas_nuevas(self):
+        """Se comprueba que en jsonl el indice solo lee las lineas añadidas"""
+        store = JsonStore(self.path_lines, "jsonl")
+        index = JsonStoreIndex(store, "id")
+        index.get("a")
+        JsonStore(self.path_lines, "jsonl").append({"id": "d", "valor": 4})
+        self.assertEqual(index.get("d"), {"id": "d", "valor": 4})
+        self.assertEqual(index.get("a"), {"id": "a", "valor": 1})
+
+    def test_jsonl_linea_incompleta(self):
+        """Se comprueba que una linea que se esta escribiendo no se indexa todavia"""
+        index = JsonStoreIndex(JsonStore(self.path_lines, "jsonl"), "id")
+        with open(self.path_lines, "a", encoding="utf-8") as file:
+            file.write('{"id": "e", "val')
+        self.assertIsNone(index.get("e"))
+        with open(self.path_lines, "a", encoding="utf-8") as file:
+            file.write('or": 5}\n')
+        self.assertEqual(index.get("e"), {"id": "e", "valor": 5})
+
+    @skipIf(msgpack is None, "msgpack no esta instalado")
+    def test_msgpack_lee_solo_registros_nuevos(self):
+        """Se comprueba que en msgpack el indice lee los registros añadidos y los que se estan escribiendo despues"""
+        path = self.folder.name + "/store.msgpack"
+        with open(path, "wb") as file:
+            file.write(msgpack.packb({"id": "a", "valor": 1}))
+        index = JsonStoreIndex(JsonStore(path, "msgpack"), "id")
+        self.assertEqual(index.get("a"), {"id": "a", "valor": 1})
+        parte = msgpack.packb({"id": "f", "valor": 6})
+        with open(path, "ab") as file:
+            file.write(parte[:3])
+        self.assertIsNone(index.get("f"))
+        with open(path, "ab") as file:
+            file.write(parte[3:])
+        self.assertEqual(index.get("f"), {"id": "f", "valor": 6})
+
+    def test_indice_por_rangos(self):
+        """Se comprueba que un indice no unico devuelve todos los registros de un rango de claves"""
+        store = JsonStore(self.path)
+        index = JsonStoreIndex(store, "valor", unique=False)
+        records = [{"id": "b", "valor": 3}, {"id": "c", "valor": 2}, {"id": "d", "valor": 3}]
+        index.update(records, store.extend(records))
+        self.assertEqual([record["id"] for record in index.between(2, 3)], ["c", "b", "d"])
+        self.assertEqual(index.get(3), {"id": "d", "valor": 3})
+        JsonStore(self.path).append({"id": "e", "valor": 0})
+        self.assertEqual([record["id"] for record in index.between(0, 1)], ["e", "a"])
+        self.assertEqual(list(index.between(4, 9)), [])
+        with self.assertRaises(ValueError):
+            list(JsonStoreIndex(store, "id").between("a", "b"))
@@ -0,0 +1,149 @@
+"""Tests de la clase JsonStore"""
+import json
+import os
+import tempfile
+from multiprocessing import Process
+from unittest import TestCase, skipIf
+from uc3m_care.json_store import JsonStore, msgpack
+
+
+def escribir_registros(path, store_format, worker):
+    """Añade 20 registros al almacen desde otro proceso"""
+    store = JsonStore(path, store_format)
+    for i in range(20):
+        store.append({"worker": worker, "n": i})
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = self.folder.name + "/store.json"
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([], file)
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def escribir_en_paralelo(self, path, store_format):
+        """Lanza 4 procesos que escriben a la vez en el mismo almacen"""
+        procesos = [Process(target=escribir_registros, args=(path, store_format, worker)) for worker in range(4)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+
+    def test_escrituras_concurrentes_json(self):
+        """Se comprueba que no se pierden registros si varios procesos escriben a la vez"""
+        self.escribir_en_paralelo(self.path, "json")
+        self.assertEqual(len(JsonStore(self.path).load()), 80)
+
+    def test_escrituras_concurrentes_jsonl(self):
+        """Se comprueba que no se pierden registros en jsonl si varios procesos escriben a la vez"""
+        path = self.folder.name + "/store.jsonl"
+        self.escribir_en_paralelo(path, "jsonl")
+        self.assertEqual(len(JsonStore(path, "jsonl").load()), 80)
+
+    def test_no_quedan_temporales(self):
+        """Se comprueba que la escritura no deja ficheros temporales y no trunca mal el fichero"""
+        store = JsonStore(self.path)
+        store.extend([{"n": i, "texto": "x" * 50} for i in range(10)])
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"n": 0, "texto": "x" * 500}], file)
+        store.append({"n": 1})
+        self.assertEqual(store.load(), [{"n": 0, "texto": "x" * 500}, {"n": 1}])
+        self.assertEqual(sorted(os.listdir(self.folder.name)), ["store.json", "store.json.lock"])
+
+    def test_fichero_vacio(self):
+        """Se comprueba que un fichero vacio se trata como una lista vacia al escribir"""
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        JsonStore(self.path).append({"n": 1})
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 1}])
+
+    def test_fichero_no_existe(self):
+        """Se comprueba que si el fichero json no existe no se crea"""
+        with self.assertRaises(FileNotFoundError):
+            JsonStore(self.folder.name + "/no_existe.json").append({"n": 1})
+
+    def test_iter_records_por_trozos(self):
+        """Se comprueba que la lectura en streaming devuelve los mismos registros aunque se corten entre trozos"""
+        registros = [{"n": i, "texto": "x" * i} for i in range(30)]
+        store = JsonStore(self.path)
+        store.extend(registros)
+        self.assertEqual(list(store.iter_records(chunk_size=7)), registros)
+        self.assertEqual(list(store.iter_records()), registros)
+
+    def test_iter_records_jsonl(self):
+        """Se comprueba que en jsonl la lectura en streaming ignora la linea que se esta escribiendo"""
+        path = self.folder.name + "/store.jsonl"
+        store = JsonStore(path, "jsonl")
+        store.extend([{"n": 1}, {"n": 2}])
+        with open(path, "a", encoding="utf-8") as file:
+            file.write('{"n": ')
+        self.assertEqual(list(store.iter_records()), [{"n": 1}, {"n": 2}])
+
+    def test_iter_records_json_erroneo(self):
+        """Se comprueba que la lectura en streaming falla si el fichero no es una lista json"""
+        for contenido in ['"n": 1', '[{"n": 1}, {"n": ', '[{"n": 1}']:
+            with open(self.path, "w", encoding="utf-8") as file:
+                file.write(contenido)
+            with self.assertRaises(json.JSONDecodeError):
+                list(JsonStore(self.path).iter_records(chunk_size=4))
+
+    def test_formato_compacto(self):
+        """Se comprueba que el formato compacto escribe la lista sin espacios y se lee igual"""
+        store = JsonStore(self.path, "compact")
+        store.extend([{"n": 1, "texto": "a b"}, {"n": 2, "texto": "c"}])
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(file.read(), '[{"n":1,"texto":"a b"},{"n":2,"texto":"c"}]')
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 1, "texto": "a b"}, {"n": 2, "texto": "c"}])
+
+    def test_conversion_de_formato(self):
+        """Se comprueba que un fichero en otro formato se lee y se convierte al escribir"""
+        JsonStore(self.path).extend([{"n": 1}])
+        store = JsonStore(self.path, "jsonl")
+        self.assertEqual(store.file_format(), "json")
+        self.assertEqual(list(store.iter_records()), [{"n": 1}])
+        store.append({"n": 2})
+        self.assertEqual(store.file_format(), "jsonl")
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 1}, {"n": 2}])
+
+    @skipIf(msgpack is None, "msgpack no esta instalado")
+    def test_formato_msgpack(self):
+        """Se comprueba que en msgpack los registros se añaden al final y se detecta el formato al leer"""
+        store = JsonStore(self.path, "msgpack")
+        store.extend([{"n": 1, "texto": "x" * 50}, {"n": 2}])
+        size = os.path.getsize(self.path)
+        store.append({"n": 3})
+        self.assertEqual(store.load_from(size)[0], [{"n": 3}])
+        with open(self.path, "ab") as file:
+            file.write(msgpack.packb({"n": 4})[:-1])
+        self.assertEqual(list(JsonStore(self.path).iter_records(chunk_size=5)),
+                         [{"n": 1, "texto": "x" * 50}, {"n": 2}, {"n": 3}])
+        self.assertEqual(JsonStore(self.path, "jsonl").file_format(), "msgpack")
+
+    def test_registro_a_medias(self):
+        """Se comprueba que un registro que se quedo a medias se corta antes de añadir el siguiente"""
+        for store_format in ["jsonl", "msgpack"]:
+            if store_format == "msgpack" and msgpack is None:
+                continue
+            with self.subTest(store_format=store_format):
+                path = self.folder.name + "/store." + store_format
+                store = JsonStore(path, store_format)
+                store.extend([{"a": 1}, {"a": 2, "b": "x" * 100}])
+                with open(path, "rb+") as file:
+                    # El proceso que escribia el segundo registro se cae a mitad
+                    file.truncate(os.path.getsize(path) - 40)
+                store.extend([{"a": 3}])
+                self.assertEqual(store.load(), [{"a": 1}, {"a": 3}])
+                self.assertFalse(store.drop_partial_record())
+
+    @skipIf(msgpack is None, "msgpack no esta instalado")
+    def test_escrituras_concurrentes_msgpack(self):
+        """Se comprueba que no se pierden registros en msgpack si varios procesos escriben a la vez"""
+        self.escribir_en_paralelo(self.path, "msgpack")
+        self.assertEqual(len(JsonStore(self.path, "msgpack").load()), 80)
@@ -0,0 +1,62 @@
+"""Tests de la clase MemoryStorage"""
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.memory_storage import MemoryStorage
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.patient_data = {
+            "patient_id": "43831e01-cd0f-4b97-aa6d-c071b42129f0",
+            "name_surname": "Fernando Alonso",
+            "registration_type": "Family",
+            "phone_number": "123456789",
+            "age": 20,
+        }
+        self.storage = MemoryStorage()
+        self.folder = tempfile.TemporaryDirectory()
+        folder = self.folder.name
+
+        class TmpManager(VaccineManager):
+            """Gestor que genera los ficheros de pacientes en una carpeta temporal"""
+            json_collection = folder
+
+        self.vaccine_manager = TmpManager(storage=self.storage)
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def test_registro_en_memoria(self):
+        """Se comprueba que los pacientes se guardan en la memoria"""
+        patient_system_id = self.vaccine_manager.request_vaccination_id(**self.patient_data)
+        self.assertEqual(len(self.storage.patients), 1)
+        self.assertEqual(self.storage.find_patient(patient_system_id), self.storage.patients[0])
+
+    def test_gestores_independientes(self):
+        """Se comprueba que dos almacenes en memoria no comparten datos"""
+        self.vaccine_manager.request_vaccination_id(**self.patient_data)
+        self.assertEqual(MemoryStorage().patients, [])
+
+    @freeze_time("2020-04-26")
+    def test_proceso_completo(self):
+        """Se comprueba que las tres funciones trabajan con el almacen en memoria"""
+        patient_system_id = self.vaccine_manager.request_vaccination_id(**self.patient_data)
+        path = self.vaccine_manager.generate_json(patient_system_id, "123456789")
+        signature = self.vaccine_manager.get_vaccine_date(path)
+        self.assertEqual(self.storage.appointments[0]["vaccine_date"], "2020-05-06")
+        self.assertEqual(self.vaccine_manager.vaccine_patient(signature), True)
+        self.assertEqual(self.storage.administrations[0]["Key_value"], signature)
+
+    def test_paciente_no_registrado(self):
+        """Se comprueba que un paciente que no esta en memoria no tiene cita"""
+        path = self.vaccine_manager.generate_json("hb545bec6cd4468c3c0736520a4328db", "123456789")
+        with self.assertRaises(VaccineManagementException) as exception:
+            self.vaccine_manager.get_vaccine_date(path)
+        self.assertEqual(exception.exception.message, "This patient is not registered")
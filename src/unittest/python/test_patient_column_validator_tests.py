@@ -0,0 +1,76 @@
+"""Tests de la clase PatientColumnValidator"""
+import os
+import subprocess
+import sys
+from unittest import TestCase, skipIf
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.patient_column_validator import PatientColumnValidator, np, VALID, INVALID_PATIENT_ID, \
+    INVALID_REGISTRATION_TYPE, INVALID_NAME_SURNAME, INVALID_PHONE_NUMBER, INVALID_AGE
+
+PATIENT_IDS = ["43831e01-cd0f-4b97-aa6d-c071b42129f0", "43831E01-CD0F-4B97-AA6D-C071B42129F0",
+               "43831e01-cd0f-3b97-aa6d-c071b42129f0", "43831e01-cd0f-4b97-ca6d-c071b42129f0",
+               "43831e01cd0f4b97aa6dc071b42129f0", "43831e01-cd0f-4b97-aa6d-c071b42129f", 12345,
+               "43831e01-cd0f-4b97-aa6d-c071b42129f0\x00", "g3831e01-cd0f-4b97-aa6d-c071b42129f0"]
+REGISTRATION_TYPES = ["Regular", "Family", "regular", "Regular\x00", "", None]
+NAMES = ["Fernando Alonso", "Fernando", "", "A B", "Fernando Alonso Diaz Garcia Ruiz", 123, " "]
+PHONES = ["123456789", "12345678", "1234567890", "+12345678", " 12345678", "1_2345678", "12345678a",
+          "١٢٣٤٥٦٧٨٩", "12345678\x00", 123456789]
+AGES = [6, 125, 5, 126, 20, "20", 20.0, True, None, 2 ** 70]
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    @staticmethod
+    def codigo_esperado(row):
+        """Devuelve el codigo que corresponde al mensaje de validate_patient"""
+        try:
+            VaccineManager().validate_patient(*row)
+        except VaccineManagementException as error:
+            return {"Invalid patient ID": INVALID_PATIENT_ID,
+                    "Invalid registration type": INVALID_REGISTRATION_TYPE,
+                    "Invalid name and surname": INVALID_NAME_SURNAME,
+                    "Invalid phone number": INVALID_PHONE_NUMBER,
+                    "Invalid age": INVALID_AGE}[error.message]
+        return VALID
+
+    @skipIf(np is None, "numpy no esta instalado")
+    def test_mismas_reglas_que_validate_patient(self):
+        """Se comprueba que cada columna da el mismo error que validate_patient fila a fila"""
+        rows = []
+        for values, column in [(PATIENT_IDS, 0), (REGISTRATION_TYPES, 1), (NAMES, 2), (PHONES, 3), (AGES, 4)]:
+            for value in values:
+                row = [PATIENT_IDS[0], "Regular", "Fernando Alonso", "123456789", 20]
+                row[column] = value
+                rows.append(row)
+        # Filas con varios errores, gana el primero
+        rows.append([12345, "x", "", "1", None])
+        rows.append([PATIENT_IDS[0], "Family", "", "1", None])
+        valid, codes = PatientColumnValidator().validate(*[list(column) for column in zip(*rows)])
+        self.assertEqual(list(codes), [self.codigo_esperado(row) for row in rows])
+        self.assertEqual(list(valid), [self.codigo_esperado(row) == VALID for row in rows])
+
+    @skipIf(np is None, "numpy no esta instalado")
+    def test_columnas_numpy(self):
+        """Se comprueba que se aceptan columnas de numpy y se devuelven los mensajes"""
+        validator = PatientColumnValidator()
+        valid, codes = validator.validate(np.array([PATIENT_IDS[0]] * 3), np.array(["Regular", "Family", "Family"]),
+                                          np.array(["Ana Lopez"] * 3), np.array(["123456789"] * 3),
+                                          np.array([20, 5, 125]))
+        self.assertEqual(list(valid), [True, False, True])
+        self.assertEqual(validator.messages(codes), [None, "Invalid age", None])
+
+    @skipIf(np is None, "numpy no esta instalado")
+    def test_columnas_distinta_longitud(self):
+        """Se comprueba que las columnas deben tener la misma longitud"""
+        with self.assertRaises(ValueError):
+            PatientColumnValidator().validate([PATIENT_IDS[0]], ["Regular"], ["Ana Lopez"], ["123456789"], [])
+
+    def test_importar_el_paquete_no_carga_numpy(self):
+        """Se comprueba que import uc3m_care no carga numpy y que PatientColumnValidator sigue en el paquete"""
+        code = "import sys, uc3m_care; print('numpy' in sys.modules); print(uc3m_care.PatientColumnValidator.__name__)"
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        output = subprocess.run([sys.executable, "-c", code], env=environment, check=True,
+                                capture_output=True, text=True).stdout
+        self.assertEqual(output.split(), ["False", "PatientColumnValidator"])
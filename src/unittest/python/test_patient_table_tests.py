@@ -0,0 +1,64 @@
+"""Tests de la clase PatientTable"""
+import json
+import tracemalloc
+import uuid
+from unittest import TestCase
+from uc3m_care.patient_table import PatientTable
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_patient_register import VaccinePatientRegister
+from uc3m_care.memory_storage import MemoryStorage
+
+
+def registro(patient_id="43831e01-cd0f-4b97-aa6d-c071b42129f0", name="Fernando Alonso",
+             registration_type="Family", phone_number="123456789", age=20):
+    """Devuelve un registro del almacen de pacientes"""
+    return VaccinePatientRegister(patient_id, name, registration_type, phone_number, age).__dict__()
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def test_registros_iguales(self):
+        """Se comprueba que los registros se devuelven igual que se añadieron, quepan o no en las columnas"""
+        records = [registro(), registro(name="Ñandú Pérez", registration_type="Regular", phone_number="012345678"),
+                   registro(patient_id="43831E01-CD0F-4B97-AA6D-C071B42129F0"),
+                   registro(phone_number="+12345678"), registro(age=300), {"otro": "formato"}]
+        table = PatientTable(records)
+        self.assertEqual(len(table), 6)
+        self.assertEqual(list(table), records)
+        self.assertEqual([list(record.keys()) for record in table], [list(record.keys()) for record in records])
+        self.assertEqual(table.column("age"), [20, 20, 20, 20, 300, None])
+        self.assertEqual(table.column("name_surname")[1], "Ñandú Pérez")
+        self.assertEqual(table.record(-1), {"otro": "formato"})
+
+    def test_busqueda(self):
+        """Se comprueba que find devuelve el ultimo registro con ese patient_system_id"""
+        first = registro()
+        second = dict(first, name_surname="Otro Nombre")
+        other = dict(first, patient_id=first["patient_id"].upper(), name_surname="Tercer Nombre")
+        table = PatientTable([first, registro(age=30), second])
+        self.assertEqual(table.find(first["patient_system_id"])["name_surname"], "Otro Nombre")
+        table.append(other)
+        self.assertEqual(table.find(first["patient_system_id"])["name_surname"], "Tercer Nombre")
+        self.assertIsNone(table.find("0" * 32))
+        self.assertIsNone(table.find("no es un md5"))
+
+    def test_memoria(self):
+        """Se comprueba que cada paciente ocupa mucho menos que su dict leido con json.load"""
+        text = json.dumps([registro(patient_id=str(uuid.uuid4())) for _ in range(1000)])
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        records = json.loads(text)
+        record_bytes = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        table = PatientTable(records)
+        self.assertLess(table.nbytes * 8, record_bytes)
+
+    def test_cargar_desde_el_gestor(self):
+        """Se comprueba que el gestor carga su registro de pacientes en la tabla"""
+        vaccine_manager = VaccineManager(storage=MemoryStorage())
+        patient_system_id = vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0",
+                                                                   "Regular", "Ana Lopez", "123456789", 20)
+        table = vaccine_manager.load_patient_table()
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.find(patient_system_id)["name_surname"], "Ana Lopez")
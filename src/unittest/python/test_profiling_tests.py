@@ -0,0 +1,65 @@
+"""Tests de la clase OperationProfiler"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from unittest import TestCase
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.profiling import OperationProfiler, active_profiler
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def registrar(self, vaccine_manager, times=1):
+        """Registra el mismo paciente varias veces"""
+        for _ in range(times):
+            vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0", "Regular",
+                                                   "Ana Lopez", "123456789", 20)
+
+    def test_perfil_de_la_sesion(self):
+        """Se comprueba que dentro del bloque se perfilan las operaciones y al salir se escribe el informe"""
+        output = io.StringIO()
+        vaccine_manager = VaccineManager(storage=MemoryStorage())
+        with OperationProfiler(output) as profiler:
+            self.assertIs(active_profiler(), profiler)
+            self.registrar(vaccine_manager, 3)
+            with self.assertRaises(Exception):
+                vaccine_manager.vaccine_patient("no")
+        self.assertIsNone(active_profiler())
+        operations = profiler.operations()
+        self.assertEqual(set(operations), {"request_vaccination_id", "vaccine_patient"})
+        self.assertEqual(operations["request_vaccination_id"]["calls"], 3)
+        self.assertEqual(operations["request_vaccination_id"]["profiled_calls"], 3)
+        self.assertGreater(operations["request_vaccination_id"]["allocation_peak"], 0)
+        report = output.getvalue()
+        self.assertIn("request_vaccination_id: 3 calls (3 profiled)", report)
+        self.assertIn("validate_patient", report)
+
+        # Fuera del bloque ya no se perfila
+        self.registrar(vaccine_manager)
+        self.assertEqual(profiler.operations()["request_vaccination_id"]["calls"], 3)
+
+    def test_sin_memoria(self):
+        """Se comprueba que con memory=False no se trazan las reservas de memoria"""
+        with OperationProfiler(io.StringIO(), memory=False) as profiler:
+            self.registrar(VaccineManager(storage=MemoryStorage()))
+        self.assertEqual(profiler.operations()["request_vaccination_id"]["allocation_peak"], 0)
+        self.assertIsNotNone(profiler.stats("request_vaccination_id"))
+        self.assertIsNone(profiler.stats("get_vaccine_date"))
+
+    def test_variable_de_entorno(self):
+        """Se comprueba que con UC3M_CARE_PROFILE se escribe el informe al terminar el proceso"""
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "profile.txt")
+            code = ("from uc3m_care.vaccine_manager import VaccineManager\n"
+                    "from uc3m_care.memory_storage import MemoryStorage\n"
+                    "VaccineManager(storage=MemoryStorage()).request_vaccination_id("
+                    "'43831e01-cd0f-4b97-aa6d-c071b42129f0', 'Regular', 'Ana Lopez', '123456789', 20)\n")
+            environment = dict(os.environ, UC3M_CARE_PROFILE=path, PYTHONPATH=os.pathsep.join(sys.path))
+            subprocess.run([sys.executable, "-c", code], env=environment, check=True)
+            with open(path, "r", encoding="utf-8") as file:
+                report = file.read()
+        self.assertIn("request_vaccination_id: 1 calls (1 profiled)", report)
@@ -0,0 +1,135 @@
+"""Tests de la clase ReadCache"""
+import json
+import os
+import tempfile
+import tracemalloc
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.json_store import JsonStore
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.read_cache import ReadCache
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "store.json")
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"id": "a"}], file)
+        self.cache = ReadCache()
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def test_fichero_sin_cambios(self):
+        """Se comprueba que un fichero que no cambia solo se lee una vez"""
+        store = JsonStore(self.path, read_cache=self.cache)
+        self.assertEqual(store.load(), [{"id": "a"}])
+        records = store.load()
+        self.assertEqual(records, [{"id": "a"}])
+        self.assertEqual(list(store.iter_records()), [{"id": "a"}])
+        self.assertEqual((self.cache.hits, self.cache.misses), (2, 1))
+        # La lista devuelta se puede modificar sin cambiar la cache
+        records.append({"id": "b"})
+        self.assertEqual(JsonStore(self.path, read_cache=self.cache).load(), [{"id": "a"}])
+
+    def test_cambio_externo(self):
+        """Se comprueba que si otro proceso cambia el fichero se vuelve a leer"""
+        store = JsonStore(self.path, read_cache=self.cache)
+        store.load()
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"id": "a"}, {"id": "c"}], file)
+        self.assertEqual(store.load(), [{"id": "a"}, {"id": "c"}])
+        self.assertEqual(self.cache.hits, 0)
+
+    def test_escrituras_propias(self):
+        """Se comprueba que lo que escribe el almacen queda en la cache y no se vuelve a leer"""
+        store = JsonStore(self.path, read_cache=self.cache)
+        store.append({"id": "b"})
+        misses = self.cache.misses
+        self.assertEqual(store.load(), [{"id": "a"}, {"id": "b"}])
+        self.assertEqual(self.cache.misses, misses)
+
+        lines = JsonStore(os.path.join(self.folder.name, "store.jsonl"), "jsonl", read_cache=self.cache)
+        lines.append({"id": "c"})
+        self.assertEqual(lines.load(), [{"id": "c"}])
+        lines.append({"id": "d"})
+        self.assertEqual(lines.load(), [{"id": "c"}, {"id": "d"}])
+
+    def test_limite_de_memoria(self):
+        """Se comprueba que se descartan los ficheros usados hace mas tiempo al pasar de max_bytes"""
+        size = os.path.getsize(self.path)
+        cache = ReadCache(max_bytes=size * 2)
+        cache.put("a", (1, size, 1), [1])
+        cache.put("b", (1, size, 1), [2])
+        self.assertEqual(cache.get("a", (1, size, 1)), [1])
+        cache.put("c", (1, size, 1), [3])
+        self.assertIsNone(cache.get("b", (1, size, 1)))
+        self.assertEqual(cache.nbytes, size * 2)
+        cache.put("d", (1, size * 3, 1), [4])
+        self.assertIsNone(cache.get("d", (1, size * 3, 1)))
+        store = JsonStore(self.path, read_cache=None)
+        self.assertEqual(store.load(), store.load())
+
+    def test_registros_devueltos_modificados(self):
+        """Se comprueba que modificar un registro devuelto no cambia la cache ni la siguiente escritura"""
+        store = JsonStore(self.path, read_cache=self.cache)
+        store.load()[0]["id"] = "x"
+        next(store.iter_records())["id"] = "y"
+        records = [{"id": "b"}]
+        store.extend(records)
+        records[0]["id"] = "z"
+        self.assertEqual(store.load(), [{"id": "a"}, {"id": "b"}])
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), [{"id": "a"}, {"id": "b"}])
+
+    @freeze_time("2020-04-26")
+    def test_cita_modificada_no_se_escribe(self):
+        """Se comprueba que una cita devuelta por appointments_between y modificada no llega al fichero"""
+        folder = self.folder.name
+        paths = [os.path.join(folder, name) for name in
+                 ["patient_registry.json", "vaccination_appointments.json", "registered_vaccinations.json"]]
+        for path in paths:
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump([], file)
+
+        class TmpManager(VaccineManager):
+            """Gestor que guarda los ficheros de pacientes en una carpeta temporal"""
+            json_collection = folder
+
+        storage = JsonStorage(*paths)
+        vaccine_manager = TmpManager(storage=storage)
+        patient_system_id = vaccine_manager.request_vaccination_id("43831e01-cd0f-4b97-aa6d-c071b42129f0",
+                                                                   "Regular", "Ana Lopez", "123456789", 20)
+        input_file = vaccine_manager.generate_json(patient_system_id, "123456789")
+        signature = vaccine_manager.get_vaccine_date(input_file)
+        next(vaccine_manager.appointments_between("2020-05-06", "2020-05-06"))["phone_number"] = "MUTATED"
+        storage.find_appointment(signature)["vaccine_date"] = "MUTATED"
+        vaccine_manager.get_vaccine_date(input_file)
+        self.assertEqual(storage.find_appointment(signature)["phone_number"], "123456789")
+        with open(paths[1], "r", encoding="utf-8") as file:
+            self.assertNotIn("MUTATED", file.read())
+
+    def test_recorrido_copia_registro_a_registro(self):
+        """Se comprueba que recorrer un fichero en la cache no copia la lista entera antes del primer registro"""
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"id": str(i), "texto": "x" * 50} for i in range(5000)], file)
+        store = JsonStore(self.path, read_cache=self.cache)
+        store.load()
+        tracemalloc.start()
+        try:
+            records = store.iter_records()
+            first = next(records)
+            peak = tracemalloc.get_traced_memory()[1]
+            records.close()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(first["id"], "0")
+        self.assertEqual(self.cache.hits, 1)
+        # Una copia de la lista entera ocuparia mas de 1 MiB
+        self.assertLess(peak, 64 * 1024)
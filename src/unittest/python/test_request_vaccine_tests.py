@@ -2,12 +2,16 @@
 
 import hashlib
 import json
+import tempfile
 from unittest import TestCase
 from datetime import datetime
 from pathlib import Path
 from freezegun import freeze_time
 from uc3m_care.vaccine_manager import VaccineManager
 from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.sqlite_storage import SqliteStorage
+from uc3m_care.json_storage import JsonStorage
 
 class MyTestCase(TestCase):
     """"Clase en la que se inicializan los tests"""
@@ -237,6 +241,146 @@ class MyTestCase(TestCase):
         #Utilizo para un hash los datos del self.patient
         hashcomprobar = vaccine_manager.request_vaccination_id(**self.patient_data)
         self.assertNotEqual(hashprueba, hashcomprobar, "Incorrect returned hash")
+    def test_registro_jsonl_una_linea_por_paciente(self):
+        """Se comprueba que en modo jsonl cada registro añade una linea al fichero"""
+        with tempfile.TemporaryDirectory() as folder:
+            class JsonlManager(VaccineManager):
+                """Gestor que guarda el registro en una carpeta temporal"""
+                patient_registry = folder + "/patient_registry.json"
+
+            vaccine_manager = JsonlManager(storage=JsonlManager.json_storage(registry_format="jsonl"))
+            hash_1 = vaccine_manager.request_vaccination_id(**self.patient_data)
+            hash_2 = vaccine_manager.request_vaccination_id(**self.patient_data)
+            with open(folder + "/patient_registry.json", "r", encoding="utf-8") as file:
+                lines = file.readlines()
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(json.loads(lines[0])["patient_system_id"], hash_1)
+        self.assertEqual(json.loads(lines[1])["patient_system_id"], hash_2)
+
+    def test_registro_cambio_de_formato(self):
+        """Se comprueba que al cambiar a jsonl se siguen viendo los pacientes registrados en json y al reves"""
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que guarda el registro en una carpeta temporal"""
+                patient_registry = folder + "/patient_registry.json"
+
+            with open(folder + "/patient_registry.json", "w", encoding="utf-8") as file:
+                json.dump([], file)
+            hash_json = TmpManager(duplicate_patients="return").request_vaccination_id(**self.patient_data)
+            jsonl_manager = TmpManager(storage=TmpManager.json_storage(registry_format="jsonl"),
+                                       duplicate_patients="return")
+            self.assertEqual(jsonl_manager.request_vaccination_id(**self.patient_data), hash_json)
+            patient = dict(self.patient_data, patient_id="c7bde2ea-1bd9-4bd6-8b0a-56a5bf2ca9b2")
+            hash_jsonl = jsonl_manager.request_vaccination_id(**patient)
+            with open(folder + "/patient_registry.json", "r", encoding="utf-8") as file:
+                self.assertEqual(len(file.readlines()), 2)
+            json_manager = TmpManager(duplicate_patients="return")
+            self.assertEqual(json_manager.request_vaccination_id(**patient), hash_jsonl)
+
+    @freeze_time("2020-04-26")
+    def test_registro_jsonl_get_vaccine_date(self):
+        """Se comprueba que get_vaccine_date encuentra pacientes registrados en modo jsonl"""
+        with tempfile.TemporaryDirectory() as folder:
+            class JsonlManager(VaccineManager):
+                """Gestor que guarda el registro y las citas en una carpeta temporal"""
+                patient_registry = folder + "/patient_registry.json"
+                vaccination_appointments = folder + "/vaccination_appointments.json"
+                json_collection = folder
+
+            with open(folder + "/vaccination_appointments.json", "w", encoding="utf-8") as file:
+                json.dump([], file)
+            vaccine_manager = JsonlManager(storage=JsonlManager.json_storage(registry_format="jsonl"))
+            patient_system_id = vaccine_manager.request_vaccination_id(**self.patient_data)
+            path = vaccine_manager.generate_json(patient_system_id, "123456789")
+            signature = vaccine_manager.get_vaccine_date(path)
+        self.assertEqual(len(signature), 64)
+    def test_registro_por_lotes(self):
+        """Se comprueba que el registro por lotes devuelve un resultado por paciente
+        y guarda solo los pacientes correctos"""
+        patient_tuple = ("c7bde2ea-1bd9-4bd6-8b0a-56a5bf2ca9b2", "Regular", "Carlos Sainz", "987654321", 30)
+        patient_error = self.patient_data.copy()
+        patient_error["phone_number"] = 123456789
+        vaccine_manager = VaccineManager()
+        results = vaccine_manager.request_vaccination_ids([self.patient_data, patient_error, patient_tuple])
+        self.assertEqual(len(results), 3)
+        self.assertEqual(len(results[0]["patient_system_id"]), 32)
+        self.assertIsNone(results[0]["error"])
+        self.assertEqual(results[1], {"patient_system_id": None, "error": "Invalid phone number"})
+        self.assertIsNone(results[2]["error"])
+        with open(self.direccion, 'r', encoding="utf-8") as file:
+            data = json.load(file)
+        guardados = [dict["patient_system_id"] for dict in data[-2:]]
+        self.assertEqual(guardados, [results[0]["patient_system_id"], results[2]["patient_system_id"]])
+        self.assertEqual(data[-1]["name_surname"], "Carlos Sainz")
+
+    def test_registro_por_lotes_mal_formado(self):
+        """Se comprueba que un paciente con claves de mas o de menos, o una tupla de otra longitud,
+        da un error solo para ese paciente y los demas se guardan"""
+        storage = MemoryStorage()
+        vaccine_manager = VaccineManager(storage=storage)
+        incompleto = self.patient_data.copy()
+        del incompleto["age"]
+        results = vaccine_manager.request_vaccination_ids([dict(self.patient_data, extra=1), incompleto,
+                                                           ("c7bde2ea-1bd9-4bd6-8b0a-56a5bf2ca9b2", "Regular"), 7,
+                                                           self.patient_data])
+        self.assertEqual(results[:4], [{"patient_system_id": None, "error": "Invalid patient record"}] * 4)
+        self.assertIsNone(results[4]["error"])
+        self.assertEqual(len(storage.patients), 1)
+
+    def test_paciente_duplicado_devuelve_existente(self):
+        """Se comprueba que con duplicate_patients="return" un paciente repetido no se vuelve a guardar"""
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que guarda el registro en una carpeta temporal"""
+                patient_registry = folder + "/patient_registry.json"
+
+            with open(folder + "/patient_registry.json", "w", encoding="utf-8") as file:
+                json.dump([], file)
+            hash_1 = TmpManager(duplicate_patients="return").request_vaccination_id(**self.patient_data)
+            vaccine_manager = TmpManager(duplicate_patients="return")
+            hash_2 = vaccine_manager.request_vaccination_id(**self.patient_data)
+            patient_tuple = ("c7bde2ea-1bd9-4bd6-8b0a-56a5bf2ca9b2", "Regular", "Carlos Sainz", "987654321", 30)
+            results = vaccine_manager.request_vaccination_ids([patient_tuple, self.patient_data, patient_tuple])
+            with open(folder + "/patient_registry.json", "r", encoding="utf-8") as file:
+                data = json.load(file)
+        self.assertEqual(hash_1, hash_2)
+        self.assertEqual(results[1], {"patient_system_id": hash_1, "error": None})
+        self.assertEqual(results[0], results[2])
+        self.assertEqual([record["patient_system_id"] for record in data], [hash_1, results[0]["patient_system_id"]])
+
+    def test_paciente_duplicado_excepcion(self):
+        """Se comprueba que con duplicate_patients="raise" un paciente repetido lanza una excepcion"""
+        vaccine_manager = VaccineManager(storage=MemoryStorage(), duplicate_patients="raise")
+        vaccine_manager.request_vaccination_id(**self.patient_data)
+        with self.assertRaises(VaccineManagementException) as exception:
+            vaccine_manager.request_vaccination_id(**self.patient_data)
+        self.assertEqual(exception.exception.message, "Patient already registered")
+        results = vaccine_manager.request_vaccination_ids([self.patient_data])
+        self.assertEqual(results, [{"patient_system_id": None, "error": "Patient already registered"}])
+        with self.assertRaises(ValueError):
+            VaccineManager(storage=MemoryStorage(), duplicate_patients="ignore")
+
+    def test_paciente_duplicado_en_mayusculas(self):
+        """Se comprueba que el mismo UUID en mayusculas es el mismo paciente en todos los almacenes"""
+        with tempfile.TemporaryDirectory() as folder:
+            registry = folder + "/patient_registry.json"
+            with open(registry, "w", encoding="utf-8") as file:
+                json.dump([], file)
+            sqlite = SqliteStorage(":memory:")
+            storages = {"memory": MemoryStorage(), "sqlite": sqlite,
+                        "json": JsonStorage(registry, folder + "/citas.json", folder + "/vacunas.json")}
+            upper = dict(self.patient_data, patient_id=self.patient_data["patient_id"].upper())
+            for name, storage in storages.items():
+                with self.subTest(storage=name):
+                    vaccine_manager = VaccineManager(storage=storage, duplicate_patients="return")
+                    patient_system_id = vaccine_manager.request_vaccination_id(**self.patient_data)
+                    self.assertEqual(vaccine_manager.request_vaccination_id(**upper), patient_system_id)
+                    results = vaccine_manager.request_vaccination_ids([upper, upper])
+                    self.assertEqual([result["patient_system_id"] for result in results], [patient_system_id] * 2)
+                    self.assertEqual(len(list(storage.iter_patients())), 1)
+                    with self.assertRaises(VaccineManagementException):
+                        VaccineManager(storage=storage, duplicate_patients="raise").request_vaccination_id(**upper)
+            sqlite.close()
 
 if __name__ == '__main__':
     unittest.main()
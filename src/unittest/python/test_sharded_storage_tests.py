@@ -0,0 +1,80 @@
+"""Tests de la clase ShardedStorage"""
+import json
+import os
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.sharded_storage import ShardedStorage
+from uc3m_care.memory_storage import MemoryStorage
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.patient_data = {
+            "patient_id": "43831e01-cd0f-4b97-aa6d-c071b42129f0",
+            "name_surname": "Fernando Alonso",
+            "registration_type": "Family",
+            "phone_number": "123456789",
+            "age": 20,
+        }
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def leer_shard(self, shard, name):
+        """Devuelve los registros de un fichero de un shard"""
+        with open(os.path.join(self.folder.name, "shard_%03d" % shard, name), "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    def test_reparto_por_prefijo(self):
+        """Se comprueba que cada registro se guarda solo en el shard de su prefijo"""
+        storage = ShardedStorage.json_shards(self.folder.name, 4)
+        storage.add_patients([{"patient_id": "a", "patient_system_id": "0001" + "0" * 28},
+                              {"patient_id": "b", "patient_system_id": "0006" + "0" * 28}])
+        storage.add_appointments([{"patient_id": "a", "phone_number": "123456789", "vaccine_date": "2020-05-06",
+                                   "patient_system_id": "b", "date_signature": "ffff" + "0" * 60}])
+        self.assertEqual([record["patient_id"] for record in self.leer_shard(1, "patient_registry.json")], ["a"])
+        self.assertEqual([record["patient_id"] for record in self.leer_shard(2, "patient_registry.json")], ["b"])
+        self.assertEqual(self.leer_shard(0, "patient_registry.json"), [])
+        self.assertEqual(len(self.leer_shard(3, "vaccination_appointments.json")), 1)
+        self.assertEqual(storage.find_patient("0006" + "0" * 28)["patient_id"], "b")
+        self.assertEqual(storage.find_appointment("ffff" + "0" * 60)["vaccine_date"], "2020-05-06")
+        self.assertIsNone(storage.find_appointment("fffe" + "0" * 60))
+        self.assertEqual(list(storage.find_appointments(["ffff" + "0" * 60, "fffe" + "0" * 60, "0" * 64])),
+                         ["ffff" + "0" * 60])
+        self.assertEqual(storage.shard_of("no es hexadecimal"), storage.shard_of("no es hexadecimal"))
+
+    def test_busqueda_por_patient_id(self):
+        """Se comprueba que la busqueda por patient_id devuelve el registro mas reciente de todos los shards"""
+        storage = ShardedStorage([MemoryStorage(), MemoryStorage()])
+        storage.add_patients([{"patient_id": "a", "patient_system_id": "1" * 32, "time_stamp": 2.0},
+                              {"patient_id": "a", "patient_system_id": "2" * 32, "time_stamp": 1.0}])
+        self.assertEqual(storage.find_patient_by_id("a")["patient_system_id"], "1" * 32)
+        self.assertIsNone(storage.find_patient_by_id("b"))
+        self.assertEqual(len(list(storage.iter_patients())), 2)
+
+    @freeze_time("2020-04-26")
+    def test_proceso_completo(self):
+        """Se comprueba que las tres funciones trabajan con el almacen repartido"""
+        folder = self.folder.name
+
+        class TmpManager(VaccineManager):
+            """Gestor que guarda los shards en una carpeta temporal"""
+            sharded_store = folder + "/shards"
+            json_collection = folder
+
+        vaccine_manager = TmpManager(storage=TmpManager.json_storage(shards=3))
+        patient_system_id = vaccine_manager.request_vaccination_id(**self.patient_data)
+        signature = vaccine_manager.get_vaccine_date(vaccine_manager.generate_json(patient_system_id, "123456789"))
+        self.assertEqual(sorted(os.listdir(folder + "/shards")), ["shard_000", "shard_001", "shard_002"])
+        self.assertEqual(TmpManager(storage=TmpManager.json_storage(shards=3)).vaccine_patient(signature), True)
+        with self.assertRaises(VaccineManagementException) as exception:
+            vaccine_manager.vaccine_patient("1" * 64)
+        self.assertEqual(exception.exception.message, "Invalid date_signature")
@@ -0,0 +1,113 @@
+"""Tests de la clase SlotAllocator"""
+import os
+import tempfile
+from datetime import date
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.memory_storage import MemoryStorage
+from uc3m_care.slot_allocator import SlotAllocator
+
+DAY = date(2020, 5, 6)
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.folder.name, "vaccination_slots.jsonl")
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def reservar(self, allocator, times, earliest=DAY, center=None):
+        """Reserva varios huecos y devuelve los (dia, centro) obtenidos"""
+        with allocator.booking() as book:
+            return [book(earliest, center) for _ in range(times)]
+
+    def test_primer_dia_libre(self):
+        """Se comprueba que cuando un dia se llena se pasa al siguiente con hueco"""
+        allocator = SlotAllocator(2)
+        self.assertEqual([day.day for day, _ in self.reservar(allocator, 5)], [6, 6, 7, 7, 8])
+        # Un dia anterior sigue libre
+        self.assertEqual(self.reservar(allocator, 1, date(2020, 5, 5)), [(date(2020, 5, 5), "default")])
+        self.assertEqual(self.reservar(allocator, 2, date(2020, 5, 5))[1][0], date(2020, 5, 8))
+        self.assertEqual(allocator.booked("default", date(2020, 5, 8)), 2)
+
+    def test_centros(self):
+        """Se comprueba que sin centro gana el que antes tiene hueco y con centro solo ese"""
+        allocator = SlotAllocator({"norte": 1, "sur": 2})
+        self.assertEqual(self.reservar(allocator, 4),
+                         [(DAY, "norte"), (DAY, "sur"), (DAY, "sur"), (date(2020, 5, 7), "norte")])
+        self.assertEqual(self.reservar(allocator, 1, center="norte"), [(date(2020, 5, 8), "norte")])
+        with self.assertRaises(VaccineManagementException) as exception:
+            self.reservar(allocator, 1, center="este")
+        self.assertEqual(exception.exception.message, "Invalid vaccination center")
+        with self.assertRaises(ValueError):
+            SlotAllocator({"norte": 0})
+
+    def test_persistencia(self):
+        """Se comprueba que los huecos se guardan y otro SlotAllocator del mismo fichero los ve"""
+        first = SlotAllocator(3, self.path)
+        second = SlotAllocator(3, self.path)
+        self.reservar(first, 2)
+        self.assertEqual(self.reservar(second, 2), [(DAY, "default"), (date(2020, 5, 7), "default")])
+        self.assertEqual(self.reservar(first, 1), [(date(2020, 5, 7), "default")])
+        with open(self.path, "r", encoding="utf-8") as file:
+            self.assertEqual(len(file.readlines()), 4)
+
+    def test_error_no_guarda(self):
+        """Se comprueba que si el bloque falla los huecos reservados se liberan"""
+        allocator = SlotAllocator(1, self.path)
+        with self.assertRaises(RuntimeError):
+            with allocator.booking() as book:
+                book(DAY)
+                raise RuntimeError("fallo al guardar las citas")
+        self.assertEqual(self.reservar(allocator, 1), [(DAY, "default")])
+        self.assertEqual(SlotAllocator(1, self.path).booked("default", DAY), 1)
+
+    def test_fichero_borrado_o_sustituido(self):
+        """Se comprueba que si el fichero se borra o se sustituye se vuelve a leer desde el principio"""
+        allocator = SlotAllocator(1, self.path)
+        self.reservar(allocator, 3)
+        os.remove(self.path)
+        self.assertEqual(self.reservar(allocator, 1), [(DAY, "default")])
+        self.assertEqual(SlotAllocator(1, self.path).booked("default", DAY), 1)
+        # Un fichero nuevo, mas grande que lo leido, con otros huecos
+        os.remove(self.path)
+        self.reservar(SlotAllocator(1, self.path + ".new"), 3, date(2020, 6, 1))
+        os.replace(self.path + ".new", self.path)
+        self.assertEqual(self.reservar(allocator, 1), [(DAY, "default")])
+        with open(self.path, "rb") as file:
+            self.assertNotIn(b"\x00", file.read())
+        self.assertEqual(SlotAllocator(1, self.path).booked("default", date(2020, 6, 3)), 1)
+
+    @freeze_time("2020-04-26")
+    def test_gestor_con_capacidad(self):
+        """Se comprueba que get_vaccine_date y get_vaccine_dates dan el primer dia libre desde el decimo"""
+        storage = MemoryStorage()
+        folder = self.folder.name
+
+        class TmpManager(VaccineManager):
+            """Gestor que guarda los ficheros de pacientes en una carpeta temporal"""
+            json_collection = folder
+
+        vaccine_manager = TmpManager(storage=storage, slot_allocator=SlotAllocator(1, self.path))
+        files = []
+        for patient_id in ["43831e01-cd0f-4b97-aa6d-c071b42129f0", "bb5dbd6f-d8b4-413f-8eb9-dd262cfc54e0",
+                           "57c811e5-3f5a-4a89-bbb8-11c0464d53e6"]:
+            patient_system_id = vaccine_manager.request_vaccination_id(patient_id, "Regular", "Ana Lopez",
+                                                                       "123456789", 20)
+            files.append(vaccine_manager.generate_json(patient_system_id, "123456789"))
+        vaccine_manager.get_vaccine_date(files[0])
+        vaccine_manager.get_vaccine_dates(files[1:])
+        self.assertEqual([appointment["vaccine_date"] for appointment in storage.appointments],
+                         ["2020-05-06", "2020-05-07", "2020-05-08"])
+
+        with self.assertRaises(VaccineManagementException) as exception:
+            TmpManager(storage=storage).get_vaccine_date(files[0], center="default")
+        self.assertEqual(exception.exception.message, "Invalid vaccination center")
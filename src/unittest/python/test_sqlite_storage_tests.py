@@ -0,0 +1,66 @@
+"""Tests de la clase SqliteStorage"""
+import tempfile
+from unittest import TestCase
+from freezegun import freeze_time
+from uc3m_care.vaccine_manager import VaccineManager
+from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.sqlite_storage import SqliteStorage
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.patient_data = {
+            "patient_id": "43831e01-cd0f-4b97-aa6d-c071b42129f0",
+            "name_surname": "Fernando Alonso",
+            "registration_type": "Family",
+            "phone_number": "123456789",
+            "age": 20,
+        }
+        self.folder = tempfile.TemporaryDirectory()
+        self.storage = SqliteStorage(self.folder.name + "/vaccines.db")
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.storage.close()
+        self.folder.cleanup()
+
+    def test_registro_y_busqueda(self):
+        """Se comprueba que los pacientes registrados se encuentran por su patient_system_id"""
+        vaccine_manager = VaccineManager(storage=self.storage)
+        patient_system_id = vaccine_manager.request_vaccination_id(**self.patient_data)
+        patient = self.storage.find_patient(patient_system_id)
+        self.assertEqual(list(patient.keys()), ["patient_id", "name_surname", "registration_type",
+                                                "phone_number", "age", "time_stamp", "patient_system_id"])
+        self.assertEqual(patient["name_surname"], "Fernando Alonso")
+        self.assertEqual(patient["age"], 20)
+        self.assertIsNone(self.storage.find_patient("0" * 32))
+        self.assertEqual(self.storage.find_patient_by_id(self.patient_data["patient_id"]), patient)
+
+    def test_datos_persisten(self):
+        """Se comprueba que los datos se guardan en el fichero de la base de datos"""
+        VaccineManager(storage=self.storage).request_vaccination_id(**self.patient_data)
+        self.storage.add_appointments([{"patient_id": "a", "phone_number": "123456789", "vaccine_date": "2020-05-06",
+                                        "patient_system_id": "b", "date_signature": "c"}])
+        storage = SqliteStorage(self.folder.name + "/vaccines.db")
+        self.assertEqual(storage.find_appointment("c")["vaccine_date"], "2020-05-06")
+        storage.close()
+
+    @freeze_time("2020-04-26")
+    def test_proceso_completo(self):
+        """Se comprueba que las tres funciones trabajan con la base de datos"""
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que genera los ficheros de pacientes en una carpeta temporal"""
+                json_collection = folder
+
+            vaccine_manager = TmpManager(storage=self.storage)
+            patient_system_id = vaccine_manager.request_vaccination_id(**self.patient_data)
+            signature = vaccine_manager.get_vaccine_date(vaccine_manager.generate_json(patient_system_id, "123456789"))
+        self.assertEqual(self.storage.find_appointment(signature)["vaccine_date"], "2020-05-06")
+        self.assertEqual(vaccine_manager.vaccine_patient(signature), True)
+        with self.assertRaises(VaccineManagementException) as exception:
+            vaccine_manager.vaccine_patient("1" * 64)
+        self.assertEqual(exception.exception.message, "Invalid date_signature")
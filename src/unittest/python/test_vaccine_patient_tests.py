@@ -1,9 +1,12 @@
 """Importamos lo necesario"""
 import unittest
 import json
+import tempfile
 from pathlib import Path
+from freezegun import freeze_time
 from uc3m_care.vaccine_manager import VaccineManager
 from uc3m_care.vaccine_management_exception import VaccineManagementException
+from uc3m_care.json_storage import JsonStorage, StreamingJsonStorage
 
 
 
@@ -117,6 +120,93 @@ class MyTestCase(unittest.TestCase):
                     break
             self.assertEqual(correcto, True, "Formato JSON incorrecto")
 
+    def test_formato_citas_incorrecto(self):
+        """Compruebo que el indice de firmas detecta citas con formato incorrecto"""
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que lee las citas de una carpeta temporal"""
+                vaccination_appointments = folder + "/vaccination_appointments.json"
+
+            with open(folder + "/vaccination_appointments.json", "w", encoding="utf-8") as file:
+                json.dump([{"date_signature": "a" * 64, "vaccine_date": "2020-05-06"}], file)
+            with self.assertRaises(VaccineManagementException) as exception:
+                TmpManager().vaccine_patient("a" * 64)
+        self.assertEqual(exception.exception.message, "Invalid appointments JSON format")
+
+    def test_firma_de_otro_gestor(self):
+        """Compruebo que una firma guardada por otro gestor se encuentra en el indice ya cargado"""
+        v_test = VaccineManager()
+        v_test.vaccine_patient(VaccineManager().get_vaccine_date(
+            v_test.generate_json("fb545bec6cd4468c3c0736520a4328db", "123456789")))
+        path = v_test.generate_json("fb545bec6cd4468c3c0736520a4328db", "123456789")
+        firma = VaccineManager().get_vaccine_date(path)
+        self.assertEqual(v_test.vaccine_patient(firma), True)
+
+    def test_citas_en_streaming(self):
+        """Compruebo que sin indice las citas se leen del fichero por partes hasta encontrar la firma"""
+        with tempfile.TemporaryDirectory() as folder:
+            citas = [{"patient_id": "a", "phone_number": "123456789", "vaccine_date": "2020-05-06",
+                      "patient_system_id": "b", "date_signature": str(i) * 64} for i in range(10)]
+            with open(folder + "/vaccination_appointments.json", "w", encoding="utf-8") as file:
+                # La lista queda sin cerrar, como si se estuviera escribiendo todavia
+                file.write(json.dumps(citas, indent=2)[:-1] + ", {no es json")
+            with open(folder + "/registered_vaccinations.json", "w", encoding="utf-8") as file:
+                json.dump([], file)
+            storage = StreamingJsonStorage(folder + "/patient_registry.json", folder + "/vaccination_appointments.json",
+                                           folder + "/registered_vaccinations.json")
+            # Lo que hay despues de la cita buscada no se llega a decodificar
+            self.assertEqual(VaccineManager(storage=storage).vaccine_patient("3" * 64), True)
+            with self.assertRaises(VaccineManagementException) as exception:
+                VaccineManager(storage=storage).vaccine_patient("f" * 64)
+        self.assertEqual(exception.exception.message, "Error while decoding JSON")
+
+    def test_almacen_sin_indice_de_citas(self):
+        """Compruebo que json_storage crea el almacen que lee las citas por partes, tambien repartido"""
+        with tempfile.TemporaryDirectory() as folder:
+            class TmpManager(VaccineManager):
+                """Gestor que guarda los shards en una carpeta temporal"""
+                sharded_store = folder
+
+            self.assertIsInstance(VaccineManager.json_storage(index_appointments=False), StreamingJsonStorage)
+            self.assertNotIsInstance(VaccineManager.json_storage(), StreamingJsonStorage)
+            storage = TmpManager.json_storage(shards=2, index_appointments=False)
+            self.assertTrue(all(isinstance(shard, StreamingJsonStorage) for shard in storage.shards))
+
+    def test_lote_de_firmas(self):
+        """Compruebo que un lote de firmas se registra en una sola escritura con un resultado por firma"""
+        for index_appointments in [True, False]:
+            with self.subTest(index_appointments=index_appointments), tempfile.TemporaryDirectory() as folder:
+                citas = [{"patient_id": "a", "phone_number": "123456789", "vaccine_date": vaccine_date,
+                          "patient_system_id": "b", "date_signature": signature * 64}
+                         for vaccine_date, signature in [("2020-05-06", "1"), ("2020-04-26", "2"), ("2020-05-07", "3")]]
+                with open(folder + "/vaccination_appointments.json", "w", encoding="utf-8") as file:
+                    json.dump(citas, file)
+                with open(folder + "/registered_vaccinations.json", "w", encoding="utf-8") as file:
+                    json.dump([], file)
+                storage_class = JsonStorage if index_appointments else StreamingJsonStorage
+                storage = storage_class(folder + "/patient_registry.json", folder + "/vaccination_appointments.json",
+                                        folder + "/registered_vaccinations.json")
+                with freeze_time("2020-04-26"):
+                    results = VaccineManager(storage=storage).vaccine_patients(
+                        ["3" * 64, "1" * 64, "2" * 64, "4" * 64, None, "3" * 64])
+                self.assertEqual([result["error"] for result in results],
+                                 [None, None, "Invalid vaccine date", "Invalid date_signature", "Invalid signature",
+                                  None])
+                self.assertEqual([result["vaccinated"] for result in results],
+                                 [True, True, False, False, False, True])
+                with open(folder + "/registered_vaccinations.json", "r", encoding="utf-8") as file:
+                    registradas = json.load(file)
+                self.assertEqual([registrada["Key_value"][0] for registrada in registradas], ["3", "1", "3"])
+                self.assertEqual(registradas[0]["Access_date"][0:10], "2020-04-26")
+
+    def test_lote_sin_firmas_validas(self):
+        """Compruebo que si ninguna firma es valida no se escribe nada"""
+        with tempfile.TemporaryDirectory() as folder:
+            storage = JsonStorage(folder + "/patient_registry.json", folder + "/vaccination_appointments.json",
+                                  folder + "/registered_vaccinations.json")
+            results = VaccineManager(storage=storage).vaccine_patients(["corta"])
+        self.assertEqual(results, [{"date_signature": "corta", "vaccinated": False, "error": "Invalid signature"}])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+"""Tests de la clase WalStore"""
+import json
+import tempfile
+from multiprocessing import Process
+from unittest import TestCase
+from uc3m_care.json_store import JsonStore
+from uc3m_care.json_storage import JsonStorage
+from uc3m_care.wal_store import WalStore
+
+
+def escribir_registros(path):
+    """Añade 20 registros al almacen desde otro proceso"""
+    store = WalStore(path, compact_size=300)
+    for i in range(20):
+        store.append({"n": i})
+
+
+class MyTestCase(TestCase):
+    """Clase en la que se inicializan los tests"""
+
+    def setUp(self) -> None:
+        """SetUp"""
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = self.folder.name + "/store.json"
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"n": 0}], file)
+
+    def tearDown(self) -> None:
+        """TearDown"""
+        self.folder.cleanup()
+
+    def leer_log(self):
+        """Devuelve las lineas del log"""
+        with open(self.path + ".wal", "r", encoding="utf-8") as file:
+            return [json.loads(line) for line in file]
+
+    def test_escritura_en_log(self):
+        """Se comprueba que los registros nuevos van al log y el snapshot no se toca"""
+        store = WalStore(self.path)
+        store.extend([{"n": 1}, {"n": 2}])
+        store.append({"n": 3})
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 0}])
+        self.assertEqual(self.leer_log(), [{"wal_base": 1}, {"n": 1}, {"n": 2}, {"n": 3}])
+        self.assertEqual(WalStore(self.path).load(), [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}])
+
+    def test_compactacion(self):
+        """Se comprueba que al pasar de compact_size el log se pasa al snapshot"""
+        store = WalStore(self.path, compact_size=30)
+        store.append({"n": 1})
+        store.append({"n": 2})
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 0}, {"n": 1}, {"n": 2}])
+        self.assertEqual(self.leer_log(), [{"wal_base": 3}])
+        store.append({"n": 3})
+        self.assertEqual(store.load(), [{"n": 0}, {"n": 1}, {"n": 2}, {"n": 3}])
+
+    def test_compactacion_interrumpida(self):
+        """Se comprueba que si se cae tras escribir el snapshot los registros del log no se duplican"""
+        store = WalStore(self.path)
+        store.extend([{"n": 1}, {"n": 2}])
+        # El snapshot ya tiene los registros del log pero el log no se ha vaciado
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump([{"n": 0}, {"n": 1}, {"n": 2}], file)
+        self.assertEqual(store.load(), [{"n": 0}, {"n": 1}, {"n": 2}])
+        store.compact()
+        self.assertEqual(JsonStore(self.path).load(), [{"n": 0}, {"n": 1}, {"n": 2}])
+
+    def test_linea_incompleta(self):
+        """Se comprueba que una linea a medio escribir se ignora y se borra en la siguiente escritura"""
+        store = WalStore(self.path)
+        store.append({"n": 1})
+        with open(self.path + ".wal", "a", encoding="utf-8") as file:
+            file.write('{"n": ')
+        self.assertEqual(store.load(), [{"n": 0}, {"n": 1}])
+        store.append({"n": 2})
+        self.assertEqual(store.load(), [{"n": 0}, {"n": 1}, {"n": 2}])
+
+    def test_escrituras_concurrentes(self):
+        """Se comprueba que no se pierden registros si varios procesos escriben y compactan a la vez"""
+        procesos = [Process(target=escribir_registros, args=(self.path,)) for _ in range(4)]
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+        self.assertEqual(len(WalStore(self.path).load()), 81)
+
+    def test_storage_con_log(self):
+        """Se comprueba que JsonStorage busca en los registros del log"""
+        appointments = self.folder.name + "/vaccination_appointments.json"
+        with open(appointments, "w", encoding="utf-8") as file:
+            json.dump([], file)
+        storage = JsonStorage(self.path, appointments, self.path, write_ahead_log=True)
+        storage.add_appointments([{"patient_id": "a", "phone_number": "123456789", "vaccine_date": "2020-05-06",
+                                   "patient_system_id": "b", "date_signature": "c"}])
+        self.assertEqual(JsonStore(appointments).load(), [])
+        self.assertEqual(storage.find_appointment("c")["vaccine_date"], "2020-05-06")
+        storage2 = JsonStorage(self.path, appointments, self.path, write_ahead_log=True)
+        self.assertEqual(storage2.find_appointment("c")["patient_system_id"], "b")